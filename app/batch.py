@@ -0,0 +1,301 @@
+"""
+BATCH MODE
+──────────
+• Runs run_pipeline over many inputs without the HTTP server: a text file
+  of reel URLs (one per line, "#" comments allowed) or a directory of WAVs.
+• Parallelism is processes × threads: every worker process loads its own
+  Whisper model (transcription is serialised per model), its threads
+  overlap the LLM / PubMed waits of the later steps.
+• Results are appended to a JSONL file as they finish, one line per input
+  (status ok, partial = some step 7 verdicts failed, or error). The ids of
+  "ok" inputs go to a checkpoint file; rerunning the same command skips
+  them, so an interrupted backfill picks up where it stopped (partial and
+  failed inputs are retried from their last pipeline checkpoint).
+
+    python -m app.batch reels.txt -o results.jsonl --processes 2 --threads 4
+    python -m app.batch recordings/ -o results.jsonl --processes 0   # threads only
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+BATCH_PROCESSES = 2        # worker processes (0 = run the threads in this process)
+BATCH_THREADS = 2          # pipelines per worker process
+AUDIO_SUFFIXES = (".wav",)
+
+Item = Dict[str, str]      # {"id": …, "source": URL or file path, "kind": "url" | "file"}
+
+
+# ───────── inputs ─────────
+def load_items(source: str) -> List[Item]:
+    """URLs from a text file, or the audio files of a directory (sorted)."""
+    path = Path(source)
+    if path.is_dir():
+        return [
+            {"id": f.stem, "source": str(f.resolve()), "kind": "file"}
+            for f in sorted(path.iterdir())
+            if f.suffix.lower() in AUDIO_SUFFIXES
+        ]
+    from .reel_utils import shortcode_from_url
+
+    items, seen = [], set()
+    for line in path.read_text(encoding="utf-8").splitlines():
+        url = line.split("#", 1)[0].strip()
+        if not url:
+            continue
+        item_id = shortcode_from_url(url)
+        if item_id in seen:
+            continue
+        seen.add(item_id)
+        items.append({"id": item_id, "source": url, "kind": "url"})
+    return items
+
+
+def read_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+# ───────── one input ─────────
+def process_item(item: Item, resume: bool = True) -> Dict[str, Any]:
+    """
+    Run the pipeline for one input; never raises (errors become the record).
+    With resume=False its pipeline checkpoints are ignored and replaced.
+    """
+    from .checkpoints import CHECKPOINTS
+    from .pipeline import run_pipeline
+    from .step_7_statement_to_truthness import failed_statements
+    from . import tracing
+
+    t0 = time.time()
+    record: Dict[str, Any] = {"id": item["id"], "source": item["source"]}
+    job_id = f"batch-{item['id']}"   # checkpoints of a failed attempt are resumed on the next run
+    try:
+        with tracing.request(job_id):
+            audio: Any = None                      # not needed once step 1 is checkpointed or cached
+            if not (resume and CHECKPOINTS.has(job_id, "update_transcript")):
+                if item["kind"] == "url":
+                    from .reel_utils import load_reel_audio
+                    from .step_1_audio_to_transcript import has_cached_transcript
+                    if not has_cached_transcript(item["id"]):
+                        audio = load_reel_audio(item["source"])
+                else:
+                    audio = item["source"]
+            result = run_pipeline(audio, item["id"], job_id=job_id, resume=resume)
+            # failed step 7 verdicts → "partial": kept out of the checkpoint so the
+            # next run resumes the pipeline checkpoints instead of skipping the input
+            failed = [st.get("id") for st in failed_statements(result)]
+            record.update(status="partial" if failed else "ok", result=result)
+            if failed:
+                record["failed_statements"] = failed
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.time() - t0, 3)
+    record["finished_at"] = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    return record
+
+
+def _worker(inbox: Any, outbox: Any, threads: int, resume: bool) -> None:
+    """Worker process: `threads` threads pull items until they see None."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # the parent handles Ctrl-C
+
+    def loop() -> None:
+        while True:
+            item = inbox.get()
+            if item is None:
+                return
+            outbox.put(process_item(item, resume))
+
+    pool = [threading.Thread(target=loop, daemon=True) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+
+# ───────── output ─────────
+class _Sink:
+    """Appends result lines, then checkpoints the id (a crash in between only duplicates a line)."""
+
+    def __init__(self, output: str, checkpoint: str):
+        for p in (output, checkpoint):
+            os.makedirs(os.path.dirname(os.path.abspath(p)), exist_ok=True)
+        self._out = open(output, "a", encoding="utf-8")
+        self._ckpt = open(checkpoint, "a", encoding="utf-8")
+        self.ok = 0
+        self.partial = 0
+        self.errors = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._out.flush()
+        if record["status"] == "ok":
+            self.ok += 1
+            self._ckpt.write(record["id"] + "\n")
+            self._ckpt.flush()
+            os.fsync(self._ckpt.fileno())
+        elif record["status"] == "partial":
+            self.partial += 1
+        else:
+            self.errors += 1
+
+    def close(self) -> None:
+        self._out.close()
+        self._ckpt.close()
+
+
+# ───────── runner ─────────
+def run_batch(
+    items: Iterable[Item],
+    output: str,
+    checkpoint: Optional[str] = None,
+    processes: int = BATCH_PROCESSES,
+    threads: int = BATCH_THREADS,
+    resume: bool = True,
+    on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Fact-check `items` into the JSONL file `output` and return a summary.
+
+    `checkpoint` defaults to "<output>.checkpoint"; with resume=True the ids
+    listed there are skipped and failed inputs continue from their pipeline
+    checkpoints, with resume=False both are started afresh.
+    """
+    checkpoint = checkpoint or output + ".checkpoint"
+    if not resume and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    done = read_checkpoint(checkpoint)
+    items = list(items)
+    todo = [it for it in items if it["id"] not in done]
+    print(f"[batch] {len(items)} inputs, {len(items) - len(todo)} already done, {len(todo)} to go")
+
+    sink = _Sink(output, checkpoint)
+    t0 = time.time()
+
+    def finish(record: Dict[str, Any]) -> None:
+        sink.write(record)
+        n = sink.ok + sink.partial + sink.errors
+        print(f"[batch] {n}/{len(todo)} {record['status']:7} {record['id']} ({record['seconds']:.1f}s)")
+        if on_record:
+            on_record(record)
+
+    try:
+        if processes <= 0:
+            _run_threads(todo, threads, resume, finish)
+        else:
+            _run_processes(todo, processes, threads, resume, finish)
+    finally:
+        sink.close()
+
+    return {
+        "inputs": len(items),
+        "skipped": len(items) - len(todo),
+        "ok": sink.ok,
+        "partial": sink.partial,
+        "errors": sink.errors,
+        "seconds": round(time.time() - t0, 3),
+        "output": output,
+        "checkpoint": checkpoint,
+    }
+
+
+def _run_threads(todo: List[Item], threads: int, resume: bool, finish: Callable[[Dict[str, Any]], None]) -> None:
+    # only `threads` items in flight: Ctrl-C then waits for those, not the whole backlog
+    threads = max(1, threads)
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="batch")
+    queued = iter(todo)
+    inflight: Set[Future] = set()
+    try:
+        while True:
+            for it in islice(queued, threads - len(inflight)):
+                inflight.add(pool.submit(process_item, it, resume))
+            if not inflight:
+                break
+            done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                finish(fut.result())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_processes(
+    todo: List[Item],
+    processes: int,
+    threads: int,
+    resume: bool,
+    finish: Callable[[Dict[str, Any]], None],
+) -> None:
+    # spawn, not fork: the parent may hold SQLite connections and threads
+    ctx = mp.get_context("spawn")
+    inbox, outbox = ctx.Queue(), ctx.Queue()
+    processes = min(processes, len(todo))
+    for it in todo:
+        inbox.put(it)
+    for _ in range(processes * threads):
+        inbox.put(None)
+
+    workers = [ctx.Process(target=_worker, args=(inbox, outbox, threads, resume), daemon=True) for _ in range(processes)]
+    for w in workers:
+        w.start()
+    pending = {it["id"] for it in todo}
+    try:
+        while pending:
+            try:
+                record = outbox.get(timeout=1.0)
+            except queue.Empty:
+                if not any(w.is_alive() for w in workers):
+                    print(f"[batch] all workers exited, {len(pending)} inputs unfinished")
+                    break
+                continue
+            pending.discard(record["id"])
+            finish(record)
+    finally:
+        for w in workers:
+            if w.is_alive():
+                w.terminate()
+            w.join()
+
+
+# ───────── CLI ─────────
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("source", help="text file with one reel URL per line, or a directory of .wav files")
+    ap.add_argument("-o", "--output", required=True, help="JSONL file results are appended to")
+    ap.add_argument("--checkpoint", help="ids finished so far (default: <output>.checkpoint)")
+    ap.add_argument("--processes", type=int, default=BATCH_PROCESSES, help="worker processes, 0 = threads only")
+    ap.add_argument("--threads", type=int, default=BATCH_THREADS, help="pipelines per worker process")
+    ap.add_argument("--limit", type=int, help="only the first N inputs")
+    ap.add_argument("--no-resume", action="store_true", help="ignore (and reset) the checkpoint and the pipeline checkpoints")
+    args = ap.parse_args(argv)
+
+    items = load_items(args.source)
+    if args.limit is not None:
+        items = items[: args.limit]
+    try:
+        summary = run_batch(
+            items, args.output, args.checkpoint,
+            processes=args.processes, threads=args.threads, resume=not args.no_resume,
+        )
+    except KeyboardInterrupt:
+        print("[batch] interrupted – rerun the same command to resume")
+        return 130
+    print(json.dumps(summary))
+    return 0 if summary["ok"] + summary["skipped"] == summary["inputs"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+SQLITE CACHE STORE
+──────────────────
+• Small persistent key → JSON-value store shared by the pipeline caches.
+• One SQLite file (WAL mode) can hold several namespaces (tables).
+• Entries expire after `ttl` seconds; above `max_entries` the least
+  recently used entries are evicted.
+• Keeps hit/miss counters per namespace (see `stats()`); every instance
+  is listed in CACHES for /metrics.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+CACHE_DIR = os.environ.get("FACT_CHECKER_CACHE_DIR", ".cache")
+
+CACHES: List["SqliteCache"] = []
+
+
+class SqliteCache:
+    def __init__(
+        self,
+        namespace: str,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        enabled: bool = True,
+    ):
+        self.namespace = namespace
+        self.path = path or os.path.join(CACHE_DIR, "cache.sqlite3")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        CACHES.append(self)
+
+    # ───────── connection ─────────
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.namespace}" ('
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "{self.namespace}_accessed" '
+                f'ON "{self.namespace}" (accessed)'
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    # ───────── reads ─────────
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return {}
+        now = time.time()
+        found: Dict[str, Any] = {}
+        with self._lock:
+            db = self._db()
+            expired = []
+            for i in range(0, len(keys), 500):      # SQLite variable limit
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = db.execute(
+                    f'SELECT key, value, created FROM "{self.namespace}" WHERE key IN ({marks})',
+                    chunk,
+                ).fetchall()
+                for key, value, created in rows:
+                    if self._expired(created, now):
+                        expired.append(key)
+                    else:
+                        found[key] = json.loads(value)
+            if expired:
+                db.executemany(f'DELETE FROM "{self.namespace}" WHERE key = ?', [(k,) for k in expired])
+            if found:
+                db.executemany(
+                    f'UPDATE "{self.namespace}" SET accessed = ? WHERE key = ?',
+                    [(now, k) for k in found],
+                )
+            db.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    # ───────── writes ─────────
+    def set(self, key: str, value: Any) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        if not self.enabled or not items:
+            return
+        now = time.time()
+        rows = [(k, json.dumps(v, ensure_ascii=False), now, now) for k, v in items.items()]
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                f'INSERT OR REPLACE INTO "{self.namespace}" (key, value, created, accessed) VALUES (?, ?, ?, ?)',
+                rows,
+            )
+            self._evict(db)
+            db.commit()
+
+    def delete(self, key: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            db = self._db()
+            db.execute(f'DELETE FROM "{self.namespace}" WHERE key = ?', (key,))
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        if self.ttl is not None:
+            db.execute(f'DELETE FROM "{self.namespace}" WHERE created < ?', (time.time() - self.ttl,))
+        if self.max_entries is not None:
+            (count,) = db.execute(f'SELECT COUNT(*) FROM "{self.namespace}"').fetchone()
+            if count > self.max_entries:
+                db.execute(
+                    f'DELETE FROM "{self.namespace}" WHERE key IN ('
+                    f' SELECT key FROM "{self.namespace}" ORDER BY accessed ASC LIMIT ?)',
+                    (count - self.max_entries,),
+                )
+
+    # ───────── stats ─────────
+    def stats(self) -> Dict[str, Any]:
+        size = 0
+        if self.enabled:
+            with self._lock:
+                (size,) = self._db().execute(f'SELECT COUNT(*) FROM "{self.namespace}"').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": size,
+        }
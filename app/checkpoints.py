@@ -0,0 +1,140 @@
+"""
+PIPELINE CHECKPOINTS
+────────────────────
+• After every step run_pipeline stores the intermediate `data` dict under
+  its job id: one gzip-compressed JSON file per step in
+  CHECKPOINT_DIR/<job id>/.
+• run_pipeline(..., job_id=…, resume=True) continues after the last stored
+  step, so a transient LLM / NCBI failure only costs the remaining steps
+  (Whisper and step 5 are not run again).
+• Checkpoints of runs that finished cleanly are removed; the rest expire
+  after CHECKPOINT_TTL.
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from .cache_store import CACHE_DIR
+
+CHECKPOINT_ENABLED = True
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+CHECKPOINT_TTL = 7 * 24 * 3600          # seconds an unfinished run stays resumable
+CHECKPOINT_PRUNE_INTERVAL = 3600
+CHECKPOINT_COMPRESSLEVEL = 6
+
+SAFE_ID_RE = re.compile(r"[^A-Za-z0-9_.-]")
+SUFFIX = ".json.gz"
+
+
+class CheckpointStore:
+    def __init__(
+        self,
+        root: str = CHECKPOINT_DIR,
+        ttl: float = CHECKPOINT_TTL,
+        enabled: bool = CHECKPOINT_ENABLED,
+    ):
+        self.root = root
+        self.ttl = ttl
+        self.enabled = enabled
+        self.saved = 0
+        self.resumed = 0
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def _dir(self, job_id: str) -> str:
+        return os.path.join(self.root, SAFE_ID_RE.sub("_", job_id))
+
+    def _file(self, job_id: str, step: str) -> str:
+        return os.path.join(self._dir(job_id), step + SUFFIX)
+
+    # ───────── read / write ─────────
+    def save(self, job_id: str, step: str, data: Dict[str, Any]) -> None:
+        """Atomically write `data` as the checkpoint of `step`."""
+        if not self.enabled:
+            return
+        path = self._file(job_id, step)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(gzip.compress(raw, compresslevel=CHECKPOINT_COMPRESSLEVEL))
+        os.replace(tmp, path)
+        self.saved += 1
+        self._maybe_prune()
+
+    def load(self, job_id: str, step: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._file(job_id, step), "rb") as f:
+                return json.loads(gzip.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: unreadable checkpoint {job_id}/{step}: {e}")
+            return None
+
+    def has(self, job_id: str, step: str) -> bool:
+        return self.enabled and os.path.exists(self._file(job_id, step))
+
+    def steps(self, job_id: str) -> Dict[str, float]:
+        """Stored steps of a job → their save time."""
+        try:
+            names = os.listdir(self._dir(job_id))
+        except FileNotFoundError:
+            return {}
+        return {
+            n[: -len(SUFFIX)]: os.path.getmtime(os.path.join(self._dir(job_id), n))
+            for n in names if n.endswith(SUFFIX)
+        }
+
+    def discard(self, job_id: str, steps: Iterable[str]) -> None:
+        for step in steps:
+            try:
+                os.remove(self._file(job_id, step))
+            except FileNotFoundError:
+                pass
+
+    def clear(self, job_id: str) -> None:
+        shutil.rmtree(self._dir(job_id), ignore_errors=True)
+
+    # ───────── housekeeping ─────────
+    def _maybe_prune(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._pruned_at < CHECKPOINT_PRUNE_INTERVAL:
+                return
+            self._pruned_at = now
+        self.prune()
+
+    def prune(self) -> int:
+        """Remove jobs whose newest checkpoint is older than the TTL; returns how many."""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        try:
+            jobs = os.listdir(self.root)
+        except FileNotFoundError:
+            return 0
+        for name in jobs:
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            jobs = len(os.listdir(self.root))
+        except FileNotFoundError:
+            jobs = 0
+        return {"enabled": self.enabled, "jobs": jobs, "saved": self.saved, "resumed": self.resumed}
+
+
+CHECKPOINTS = CheckpointStore()
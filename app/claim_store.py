@@ -0,0 +1,300 @@
+"""
+CLAIM STORE
+───────────
+• Persistent knowledge base of checked claims: canonical statement text,
+  its embedding, the query + evidence it used and the step 7 verdict.
+• Before steps 3–7, every statement is embedded and compared with all
+  stored claims in one mat-mul; a match at or above CLAIM_MIN_SIMILARITY
+  reuses the stored verdict and skips the per-claim chain.
+• Embedding similarity alone does not see negations or changed numbers
+  ("X causes cancer" / "X does not cause cancer", "2 cups" / "10 cups"),
+  so a match must also carry the same negation words and numbers.
+• Entries older than CLAIM_MAX_AGE are ignored and pruned; failed verdicts
+  and claims checked without any evidence are not stored.
+• Vectors live in SQLite and, once loaded, in an in-memory matrix.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache_store import CACHE_DIR
+from .embeddings import embed_texts
+from .llmconfigs import MODEL_EMBED
+from .step_7_statement_to_truthness import is_fallback
+from . import tracing
+
+CLAIM_STORE_ENABLED = True
+CLAIM_MIN_SIMILARITY = 0.92          # cosine; near-paraphrases only
+CLAIM_MAX_AGE = 30 * 24 * 3600       # seconds before a verdict must be re-checked
+CLAIM_STORE_MAX_ENTRIES = 50_000
+CLAIM_STORE_PATH = os.path.join(CACHE_DIR, "claims.sqlite3")
+
+STORABLE_VERDICTS = ("true", "false", "uncertain")
+REUSED_FIELDS = ("query", "evidence", "verdict", "confidence", "rationale")
+
+CLAIM_MATCH_CANDIDATES = 5          # stored claims above the threshold checked per statement
+
+PUNCT_RE = re.compile(r"[^\w\s%.-]")
+SPACE_RE = re.compile(r"\s+")
+CONTRACTION_RE = re.compile(r"\b(can)not\b|n[’']t\b")
+WORD_RE = re.compile(r"\d+(?:[.,]\d+)*|[a-z]+")
+NEGATIONS = {"not", "no", "never", "none", "nor", "neither", "nothing", "nobody", "nowhere", "without"}
+NUMBER_WORDS = {
+    w: str(i) for i, w in enumerate(
+        "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen "
+        "fifteen sixteen seventeen eighteen nineteen twenty".split())
+}
+NUMBER_WORDS.update({"thirty": "30", "forty": "40", "fifty": "50", "sixty": "60", "seventy": "70",
+                     "eighty": "80", "ninety": "90", "hundred": "100", "thousand": "1000",
+                     "million": "1000000", "billion": "1000000000", "half": "0.5", "double": "2", "twice": "2"})
+
+
+def canonicalise(text: str) -> str:
+    """Lower-case, strip quotes/punctuation and collapse whitespace."""
+    text = PUNCT_RE.sub(" ", text.lower())
+    return SPACE_RE.sub(" ", text).strip(" .-")
+
+
+def claim_signature(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Negation words and numbers of a claim – two claims may only share a verdict if these agree."""
+    text = CONTRACTION_RE.sub(lambda m: f"{m.group(1) or ''} not", text.lower())
+    negations, numbers = [], []
+    for tok in WORD_RE.findall(text):
+        if tok in NEGATIONS:
+            negations.append(tok)
+        elif tok[0].isdigit():
+            numbers.append(tok.replace(",", ""))
+        elif tok in NUMBER_WORDS:
+            numbers.append(NUMBER_WORDS[tok])
+    return tuple(sorted(negations)), tuple(sorted(numbers))
+
+
+class ClaimStore:
+    def __init__(
+        self,
+        path: str = CLAIM_STORE_PATH,
+        min_similarity: float = CLAIM_MIN_SIMILARITY,
+        max_age: float = CLAIM_MAX_AGE,
+        max_entries: int = CLAIM_STORE_MAX_ENTRIES,
+        enabled: bool = CLAIM_STORE_ENABLED,
+    ):
+        self.path = path
+        self.min_similarity = min_similarity
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # in-memory copy of the live entries (loaded on first use)
+        self._ids: Optional[np.ndarray] = None
+        self._created: np.ndarray = np.zeros(0)
+        self._vecs: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+
+    # ───────── storage ─────────
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS claims ("
+                " id INTEGER PRIMARY KEY,"
+                " canonical TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " embedding BLOB NOT NULL,"
+                " record TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " UNIQUE (canonical, model))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self) -> None:
+        # caller holds self._lock
+        if self._ids is not None:
+            return
+        cutoff = time.time() - self.max_age
+        rows = self._db().execute(
+            "SELECT id, embedding, created_at FROM claims WHERE model = ? AND created_at >= ?",
+            (MODEL_EMBED, cutoff),
+        ).fetchall()
+        self._ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self._created = np.array([r[2] for r in rows], dtype=np.float64)
+        self._vecs = (
+            np.stack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+            if rows else np.zeros((0, 0), dtype=np.float32)
+        )
+
+    def _prune(self, db: sqlite3.Connection) -> int:
+        removed = db.execute("DELETE FROM claims WHERE created_at < ?", (time.time() - self.max_age,)).rowcount
+        (count,) = db.execute("SELECT COUNT(*) FROM claims").fetchone()
+        if count > self.max_entries:
+            removed += db.execute(
+                "DELETE FROM claims WHERE id IN (SELECT id FROM claims ORDER BY created_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            ).rowcount
+        return removed
+
+    def _remember(self, db: sqlite3.Connection, replaced: Sequence[int], canonicals: Sequence[str]) -> None:
+        """Update the in-memory matrix after an insert (caller holds self._lock)."""
+        if self._ids is None:
+            return
+        marks = ",".join("?" * len(canonicals))
+        rows = db.execute(
+            f"SELECT id, embedding, created_at FROM claims WHERE model = ? AND canonical IN ({marks})",
+            (MODEL_EMBED, *canonicals),
+        ).fetchall()
+        keep = ~np.isin(self._ids, np.asarray(replaced, dtype=np.int64))
+        new_vecs = np.stack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+        old_vecs = self._vecs[keep] if self._vecs.size else np.zeros((0, new_vecs.shape[1]), dtype=np.float32)
+        self._ids = np.concatenate([self._ids[keep], np.array([r[0] for r in rows], dtype=np.int64)])
+        self._created = np.concatenate([self._created[keep], np.array([r[2] for r in rows], dtype=np.float64)])
+        self._vecs = np.vstack([old_vecs, new_vecs]) if old_vecs.shape[1] == new_vecs.shape[1] else new_vecs
+
+    # ───────── lookup ─────────
+    def lookup(self, texts: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Stored record (query, evidence, verdict, confidence, rationale + the
+        matched claim and similarity) for every text that has a fresh
+        near-duplicate, else None.
+        """
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+        with tracing.span("claim_store.lookup", claims=len(texts)) as sp:
+            try:
+                queries = embed_texts([canonicalise(t) for t in texts])
+            except Exception as e:
+                print(f"Warning: claim store lookup skipped, embedding failed: {e}")
+                return [None] * len(texts)
+
+            with self._lock:
+                self._load()
+                ids, created, vecs = self._ids, self._created, self._vecs
+            results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+            rejected = 0
+            if len(ids) and vecs.shape[1] == queries.shape[1]:
+                sims = queries @ vecs.T                                   # (texts, stored)
+                sims[:, created < time.time() - self.max_age] = -1.0      # expired since load
+                for i, row in enumerate(sims):
+                    above = np.flatnonzero(row >= self.min_similarity)
+                    if not len(above):
+                        continue
+                    signature = claim_signature(texts[i])
+                    for j in above[np.argsort(-row[above])][:CLAIM_MATCH_CANDIDATES]:
+                        record = self._record(int(ids[j]), float(row[j]))
+                        if record is not None and claim_signature(record["claim"]) == signature:
+                            results[i] = record
+                            break
+                        rejected += 1
+            found = sum(r is not None for r in results)
+            self.hits += found
+            self.misses += len(texts) - found
+            sp.set(hits=found, rejected=rejected)
+        return results
+
+    def _record(self, claim_id: int, similarity: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT text, record, created_at FROM claims WHERE id = ?", (claim_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        text, record, created_at = row
+        return {**json.loads(record), "claim": text, "similarity": round(similarity, 4), "created_at": created_at}
+
+    # ───────── writes ─────────
+    def add_many(self, statements: Sequence[Dict[str, Any]]) -> int:
+        """Store checked statements (skips failed / fallback verdicts and evidence-less ones); returns how many."""
+        if not self.enabled:
+            return 0
+        keep = [
+            s for s in statements
+            if s.get("text") and s.get("verdict") in STORABLE_VERDICTS and s.get("evidence")
+            and not is_fallback(s)
+        ]
+        if not keep:
+            return 0
+        try:
+            vecs = embed_texts([canonicalise(s["text"]) for s in keep])
+        except Exception as e:
+            print(f"Warning: claims not stored, embedding failed: {e}")
+            return 0
+        now = time.time()
+        rows = [
+            (
+                canonicalise(s["text"]), MODEL_EMBED, s["text"],
+                np.ascontiguousarray(vec, dtype=np.float32).tobytes(),
+                json.dumps({k: s.get(k) for k in REUSED_FIELDS}, ensure_ascii=False),
+                now,
+            )
+            for s, vec in zip(keep, vecs)
+        ]
+        canonicals = [r[0] for r in rows]
+        marks = ",".join("?" * len(canonicals))
+        with self._lock:
+            db = self._db()
+            replaced = [i for (i,) in db.execute(
+                f"SELECT id FROM claims WHERE model = ? AND canonical IN ({marks})", (MODEL_EMBED, *canonicals)
+            )]
+            db.executemany(
+                "INSERT OR REPLACE INTO claims (canonical, model, text, embedding, record, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if self._prune(db):
+                self._ids = None      # rows went away: reload the matrix on next lookup
+            else:
+                self._remember(db, replaced, canonicals)
+            db.commit()
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (size,) = self._db().execute("SELECT COUNT(*) FROM claims").fetchone() if self.enabled else (0,)
+        lookups = self.hits + self.misses
+        return {
+            "namespace": "claims",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": size,
+        }
+
+
+CLAIM_STORE = ClaimStore()
+
+
+def reuse_known_claims(
+    data: Dict[str, Any],
+    on_verdict: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fill statements that match a stored claim in place (query, evidence,
+    verdict, confidence, rationale + "reused_from") and call `on_verdict`
+    for them. Returns the statements that still need steps 3–7.
+    """
+    statements = data.get("statements", [])
+    matches = CLAIM_STORE.lookup([s.get("text", "") for s in statements])
+    todo = []
+    for stmt, match in zip(statements, matches):
+        if match is None:
+            todo.append(stmt)
+            continue
+        for field in REUSED_FIELDS:
+            stmt[field] = match.get(field)
+        stmt["reused_from"] = {k: match[k] for k in ("claim", "similarity", "created_at")}
+        print(f"Claim store hit ({match['similarity']:.3f}) for statement {stmt.get('id')}: {match['claim']}")
+        if on_verdict:
+            on_verdict(stmt)
+    return todo
@@ -0,0 +1,56 @@
+"""
+EMBEDDINGS
+──────────
+• Local embedding model (Ollama /v1/embeddings) for cheap similarity checks.
+• Vectors are L2-normalised, so cosine similarity is a single mat-vec product.
+• Every text is embedded once; vectors are kept in the shared SqliteCache.
+"""
+
+import hashlib
+from typing import List, Sequence
+
+import numpy as np
+
+from .cache_store import SqliteCache
+from .llmconfigs import CLIENT_EMBED, MODEL_EMBED
+from . import tracing
+
+EMBED_CACHE = SqliteCache("embeddings", max_entries=200_000)
+
+
+def _key(text: str) -> str:
+    return hashlib.sha256(f"{MODEL_EMBED}|{text}".encode("utf-8")).hexdigest()
+
+
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """(len(texts), dim) float32 matrix of unit vectors."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    keys = [_key(t) for t in texts]
+    cached = EMBED_CACHE.get_many(keys)
+    missing = [i for i, k in enumerate(keys) if k not in cached]
+    if missing:
+        with tracing.span("embed", model=MODEL_EMBED, texts=len(missing), cached=len(keys) - len(missing)):
+            res = CLIENT_EMBED.embeddings.create(model=MODEL_EMBED, input=[texts[i] for i in missing])
+        fresh = {keys[i]: item.embedding for i, item in zip(missing, res.data)}
+        EMBED_CACHE.set_many(fresh)
+        cached.update(fresh)
+
+    vecs = np.asarray([cached[k] for k in keys], dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs / np.maximum(norms, 1e-12)
+
+
+def cosine_similarities(query: str, texts: Sequence[str]) -> np.ndarray:
+    """Cosine similarity of `query` against every entry of `texts`."""
+    if not texts:
+        return np.zeros(0, dtype=np.float32)
+    vecs = embed_texts([query, *texts])
+    return vecs[1:] @ vecs[0]
+
+
+def top_k_indices(scores: np.ndarray, threshold: float, top_k: int) -> List[int]:
+    """Indices (original order) of the `top_k` best scores that reach `threshold`."""
+    order = np.argsort(-scores, kind="stable")
+    keep = [int(i) for i in order[:top_k] if scores[i] >= threshold]
+    return sorted(keep)
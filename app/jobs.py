@@ -0,0 +1,152 @@
+"""
+PIPELINE JOBS
+─────────────
+• Runs pipelines on a bounded worker pool, off the uvicorn event loop.
+• submit() returns a Job right away; callers poll it (GET /jobs/{id})
+  or block on wait().
+• At most JOB_QUEUE_MAX jobs may wait for a worker; beyond that submit()
+  raises QueueFullError (→ HTTP 429).
+• Jobs submitted with events=True collect progress events (emit()),
+  which GET /jobs/{id}/events streams as server-sent events.
+• Finished jobs are kept for JOB_RETENTION seconds.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from . import tracing
+
+JOB_WORKERS = 2            # pipelines running at the same time
+JOB_QUEUE_MAX = 32         # jobs allowed to wait for a worker
+JOB_RETENTION = 3600       # seconds a finished job stays pollable
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class Job:
+    def __init__(self, job_id: str, meta: Optional[Dict[str, Any]] = None, key: Optional[str] = None):
+        self.id = job_id
+        self.key = key
+        self.meta = meta or {}
+        self.status = "queued"            # queued | running | done | error
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.exception: Optional[BaseException] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = threading.Event()
+        self.events: List[Dict[str, Any]] = []
+
+    def emit(self, event: str, data: Any) -> None:
+        """Record a progress event (transcript, statements, verdict, …)."""
+        self.events.append({"event": event, "data": data, "at": time.time()})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "meta": self.meta,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+class JobManager:
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_queue: int = JOB_QUEUE_MAX,
+        retention: float = JOB_RETENTION,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        meta: Optional[Dict[str, Any]] = None,
+        key: Optional[str] = None,
+        events: bool = False,
+        **kwargs: Any,
+    ) -> Job:
+        """
+        Queue `fn(*args, **kwargs)`. If a job with the same `key` is still
+        queued or running, that job is returned instead of a new one.
+        With `events`, `fn` also receives `on_event=job.emit`.
+        """
+        with self._lock:
+            self._prune()
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and not job.done.is_set():
+                        return job
+            if self._count("queued") >= self.max_queue:
+                raise QueueFullError(f"job queue is full ({self.max_queue} waiting)")
+            job = Job(uuid.uuid4().hex, meta, key)
+            self._jobs[job.id] = job
+        if events:
+            kwargs["on_event"] = job.emit
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            with tracing.request(job.id):     # the job id doubles as trace request id
+                job.result = fn(*args, **kwargs)
+            job.status = "done"
+        except BaseException as exc:
+            job.exception = exc
+            job.error = getattr(exc, "detail", None) or str(exc) or type(exc).__name__
+            job.status = "error"
+        finally:
+            job.finished_at = time.time()
+            job.done.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job: Job, timeout: Optional[float] = None) -> Any:
+        """Block until `job` finishes; return its result or re-raise its error."""
+        if not job.done.wait(timeout):
+            raise TimeoutError(f"job {job.id} still {job.status}")
+        if job.exception is not None:
+            raise job.exception
+        return job.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._count("queued"),
+                "running": self._count("running"),
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # caller holds self._lock
+    def _count(self, status: str) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == status)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
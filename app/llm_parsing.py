@@ -0,0 +1,127 @@
+"""
+STRUCTURED LLM OUTPUT
+─────────────────────
+• structured_completion() asks for JSON that matches a JSON schema
+  (`response_format`, supported by Ollama's OpenAI endpoint) and runs a
+  step-specific parser over the reply.
+• If the reply does not parse, the model gets exactly ONE repair prompt
+  (original task + its reply + the parse error); after that ParseError.
+• Unparsable replies are evicted from the completion cache.
+• Per-step counters (ok / repaired / failed) → parse_stats().
+"""
+
+import json
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:      # imported lazily where a client is actually built
+    import openai
+
+from .llmconfigs import LLM_CACHE, chat_completion, completion_key, seeded
+
+STRUCTURED_OUTPUT = True      # False → plain completions, parser only
+
+CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+REPAIR_TMPL = """
+{prompt}
+
+YOUR PREVIOUS ANSWER
+--------------------
+{reply}
+--------------------
+
+It could not be used: {error}
+Answer again. Return ONLY valid JSON matching the required format, nothing else.
+"""
+
+
+class ParseError(ValueError):
+    pass
+
+
+class _Unparsable(Exception):
+    """Internal: reply that failed `parse`, kept for the repair prompt."""
+    def __init__(self, reply: str, error: Exception):
+        super().__init__(str(error))
+        self.reply = reply
+        self.error = error
+
+
+_STATS: Dict[str, Dict[str, int]] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _count(step: str, outcome: str) -> None:
+    with _STATS_LOCK:
+        counts = _STATS.setdefault(step, {"ok": 0, "repaired": 0, "failed": 0})
+        counts[outcome] += 1
+
+
+def parse_stats() -> Dict[str, Dict[str, int]]:
+    with _STATS_LOCK:
+        return {step: dict(counts) for step, counts in _STATS.items()}
+
+
+def load_json_reply(reply: str) -> Any:
+    """json.loads after stripping Markdown code fences."""
+    try:
+        return json.loads(CODE_FENCE_RE.sub("", reply.strip()))
+    except ValueError as exc:
+        raise ParseError(f"invalid JSON: {exc}") from exc
+
+
+def structured_completion(
+    step: str,
+    client: "openai.OpenAI",
+    model: str,
+    prompt: str,
+    parse: Callable[[str], Any],
+    schema: Optional[Dict[str, Any]] = None,
+    temperature: float = 0.0,
+    max_tokens: int = 512,
+    use_cache: bool = False,
+) -> Any:
+    """
+    Completion → parse(reply). `parse` raises ValueError on unusable output,
+    which triggers a single repair round; a second failure raises ParseError.
+    """
+    kwargs: Dict[str, Any] = {}
+    if STRUCTURED_OUTPUT and schema is not None:
+        kwargs["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": f"{step}_output", "schema": schema},
+        }
+
+    def attempt(p: str) -> Any:
+        reply = chat_completion(
+            client, model, p,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            **kwargs,
+        )
+        try:
+            return parse(reply)
+        except ValueError as exc:
+            if use_cache:
+                messages = [{"role": "user", "content": p}]
+                LLM_CACHE.delete(completion_key(model, messages, temperature, max_tokens, **seeded(temperature, kwargs)))
+            raise _Unparsable(reply, exc) from exc
+
+    try:
+        value = attempt(prompt)
+        _count(step, "ok")
+        return value
+    except _Unparsable as first:
+        print(f"[{step}] unparsable LLM output ({first.error}) --> one repair attempt")
+        repair = REPAIR_TMPL.format(prompt=prompt.strip(), reply=first.reply.strip(), error=first.error)
+
+    try:
+        value = attempt(repair)
+        _count(step, "repaired")
+        return value
+    except _Unparsable as second:
+        _count(step, "failed")
+        raise ParseError(f"[{step}] unparsable after repair: {second.error}\n{second.reply}")
@@ -0,0 +1,179 @@
+"""
+LLM BACKEND POOL
+────────────────
+• Several OpenAI-compatible backends (Ollama hosts), each with a weight,
+  a concurrency limit and an optional list of models it serves.
+• Requests go to the healthy backend with the fewest outstanding requests
+  per unit of weight; per-step routes can pin a step to some backends.
+• When every eligible backend is at its limit, callers wait.
+• Connection failures mark a backend unhealthy and fail over once;
+  a background health check (GET /models) brings it back.
+• RoutedClient looks like `openai.OpenAI` for `.chat.completions.create`
+  and `.embeddings.create`, so the steps keep calling CLIENT_n as before.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:      # the SDK is imported on the first request, not at startup
+    import openai
+
+HEALTH_CHECK_TIMEOUT = 5
+
+
+class Backend:
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        api_key: str = "ollama",
+        weight: float = 1.0,
+        max_concurrency: int = 4,
+        models: Optional[Iterable[str]] = None,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.weight = max(weight, 1e-6)
+        self.max_concurrency = max_concurrency
+        self.models = set(models or ())
+        self.outstanding = 0
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+        self._client: Optional["openai.OpenAI"] = None
+
+    @property
+    def client(self) -> "openai.OpenAI":
+        if self._client is None:
+            import openai
+            self._client = openai.OpenAI(base_url=self.base_url, api_key=self.api_key)
+        return self._client
+
+    def serves(self, model: Optional[str]) -> bool:
+        return not self.models or model is None or model in self.models
+
+    def check(self) -> bool:
+        try:
+            self.client.with_options(timeout=HEALTH_CHECK_TIMEOUT, max_retries=0).models.list()
+            self.healthy = True
+        except Exception:
+            self.healthy = False
+        return self.healthy
+
+
+class BackendPool:
+    def __init__(self, backends: List[Backend], routes: Optional[Dict[str, List[str]]] = None):
+        if not backends:
+            raise ValueError("BackendPool needs at least one backend")
+        self.backends = backends
+        self.routes = routes or {}
+        self._cond = threading.Condition()
+        self._health_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, backends: List[Dict[str, Any]], routes: Optional[Dict[str, List[str]]] = None) -> "BackendPool":
+        return cls([Backend(**cfg) for cfg in backends], routes)
+
+    # ───────── selection ─────────
+    def _eligible(self, step: str, model: Optional[str], exclude: Iterable[Backend] = ()) -> List[Backend]:
+        names = self.routes.get(step)
+        eligible = [
+            b for b in self.backends
+            if (names is None or b.name in names) and b.serves(model) and b not in exclude
+        ]
+        if not eligible:
+            raise LookupError(f"no LLM backend configured for step={step} model={model}")
+        healthy = [b for b in eligible if b.healthy]
+        # all down: keep trying them rather than failing outright
+        return healthy or eligible
+
+    def acquire(self, step: str, model: Optional[str], exclude: Iterable[Backend] = ()) -> Backend:
+        """Reserve a slot on the least loaded eligible backend (blocks while all are full)."""
+        with self._cond:
+            while True:
+                free = [b for b in self._eligible(step, model, exclude) if b.outstanding < b.max_concurrency]
+                if free:
+                    backend = min(free, key=lambda b: ((b.outstanding + 1) / b.weight, -b.weight))
+                    backend.outstanding += 1
+                    backend.requests += 1
+                    return backend
+                self._cond.wait()
+
+    def release(self, backend: Backend) -> None:
+        with self._cond:
+            backend.outstanding -= 1
+            self._cond.notify_all()
+
+    def call(self, step: str, model: Optional[str], fn: Callable[["openai.OpenAI"], Any]) -> Any:
+        """Run `fn(client)` on a routed backend; fail over once on connection errors."""
+        import openai
+        tried: List[Backend] = []
+        last_exc: Optional[Exception] = None
+        while True:
+            try:
+                backend = self.acquire(step, model, exclude=tried)
+            except LookupError:
+                if last_exc is not None:
+                    raise last_exc
+                raise
+            try:
+                return fn(backend.client)
+            except (openai.APIConnectionError, openai.APITimeoutError) as exc:
+                backend.healthy = False
+                backend.failures += 1
+                tried.append(backend)
+                last_exc = exc
+                print(f"[LLM pool] backend '{backend.name}' failed ({exc}); marked unhealthy")
+                if len(tried) > 1:
+                    raise
+            finally:
+                self.release(backend)
+
+    # ───────── health ─────────
+    def check_health(self) -> Dict[str, bool]:
+        return {b.name: b.check() for b in self.backends}
+
+    def start_health_checks(self, interval: float) -> None:
+        if self._health_thread is not None or interval <= 0:
+            return
+
+        def loop() -> None:
+            while True:
+                time.sleep(interval)
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=loop, name="llm-health", daemon=True)
+        self._health_thread.start()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "name": b.name,
+                "base_url": b.base_url,
+                "healthy": b.healthy,
+                "outstanding": b.outstanding,
+                "max_concurrency": b.max_concurrency,
+                "requests": b.requests,
+                "failures": b.failures,
+            }
+            for b in self.backends
+        ]
+
+
+class RoutedClient:
+    """Drop-in for `openai.OpenAI` that routes every call of one step through a pool."""
+
+    def __init__(self, pool: BackendPool, step: str):
+        self.pool = pool
+        self.step = step
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+        self.embeddings = SimpleNamespace(create=self._embeddings_create)
+
+    def _chat_create(self, **kwargs: Any) -> Any:
+        return self.pool.call(self.step, kwargs.get("model"), lambda c: c.chat.completions.create(**kwargs))
+
+    def _embeddings_create(self, **kwargs: Any) -> Any:
+        return self.pool.call(self.step, kwargs.get("model"), lambda c: c.embeddings.create(**kwargs))
@@ -1,32 +1,77 @@
-import openai
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:      # imported lazily where a client is actually built
+    import openai
+
+from .cache_store import SqliteCache
+from .llm_pool import BackendPool, RoutedClient
+from . import tracing
 
 OPENAI_BASE_URL   = "http://localhost:11434/v1"
 BASE_MODEL        = "gemma3:27b"     
 BASE_API_KEY    = "ollama" 
 BASE_TEMP        = 0.7
+
 # ────────────────────────────────────────────────────────────────────
-# Configuration STEP2
+# Backend pool: every CLIENT_n below routes through these hosts
+# ────────────────────────────────────────────────────────────────────
+LLM_BACKENDS = [
+    {"name": "local", "base_url": OPENAI_BASE_URL, "api_key": BASE_API_KEY,
+     "weight": 1, "max_concurrency": 4},
+    # {"name": "judge", "base_url": "http://gpu-2:11434/v1", "api_key": BASE_API_KEY,
+    #  "weight": 2, "max_concurrency": 2, "models": ["gemma3:27b"]},
+]
+# step → backend names it may use (steps not listed may use every backend)
+LLM_ROUTES = {
+    # "step5": ["local"],
+    # "step6": ["judge"],
+    # "step7": ["judge"],
+}
+LLM_HEALTH_CHECK_INTERVAL = 30   # seconds, 0 disables the background check
+
+LLM_POOL = BackendPool.from_config(LLM_BACKENDS, LLM_ROUTES)
+
 # ────────────────────────────────────────────────────────────────────
-CLIENT_2 = openai.OpenAI(
-    base_url=OPENAI_BASE_URL,  
-    api_key=BASE_API_KEY
+# Completion cache (shared by all steps)
+# ────────────────────────────────────────────────────────────────────
+LLM_CACHE_ENABLED        = True
+LLM_CACHE_TTL            = 30 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES    = 50_000
+# Cached calls with temperature > 0 are sent with a fixed seed, so the stored
+# reply is the one a rerun would sample anyway (reproducible, not "one random
+# draw kept forever"). Trade-off: a prompt always gets the same sample, and a
+# backend that ignores `seed` still pins its first draw. True → never cache
+# sampled calls and draw a fresh sample every time instead.
+LLM_CACHE_BYPASS_SAMPLED = False
+LLM_CACHE_SEED           = 0         # seed for cached sampled calls (None → no seed)
+
+LLM_CACHE = SqliteCache(
+    "llm_completions",
+    ttl=LLM_CACHE_TTL,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    enabled=LLM_CACHE_ENABLED,
 )
+# ────────────────────────────────────────────────────────────────────
+# Configuration STEP2
+# ────────────────────────────────────────────────────────────────────
+CLIENT_2 = RoutedClient(LLM_POOL, "step2")
 
 MODEL_2 = BASE_MODEL  
 TEMP_2 = BASE_TEMP
-MAX_TOKENS_2 = 128
+MAX_TOKENS_2 = 256
+CACHE_2 = True
 
 # ────────────────────────────────────────────────────────────────────
 # Configuration STEP3
 # ────────────────────────────────────────────────────────────────────
-CLIENT_3 = openai.OpenAI(
-    base_url=OPENAI_BASE_URL,  
-    api_key=BASE_API_KEY
-)
+CLIENT_3 = RoutedClient(LLM_POOL, "step3")
 
 MODEL_3 = BASE_MODEL  
 TEMP_3 = BASE_TEMP
 MAX_TOKENS_3 = 1024
+CACHE_3 = True
 
 
 
@@ -34,38 +79,112 @@ MAX_TOKENS_3 = 1024
 # Configuration STEP5
 # ────────────────────────────────────────────────────────────────────
 
-CLIENT_5 = openai.OpenAI(
-    base_url=OPENAI_BASE_URL,
-    api_key=BASE_API_KEY
-)
+CLIENT_5 = RoutedClient(LLM_POOL, "step5")
 
 MODEL_5 = "gemma3:12b"
 TEMP_5 = BASE_TEMP
 MAX_TOKENS_5 = 512
+CACHE_5 = True
+MAX_WORKERS_5 = 4          # abstracts fetched + summarised concurrently
 
 
 # ────────────────────────────────────────────────────────────────────
 # Configuration STEP6
 # ────────────────────────────────────────────────────────────────────
 
-CLIENT_6 = openai.OpenAI(
-    base_url=OPENAI_BASE_URL,
-    api_key=BASE_API_KEY
-)
+CLIENT_6 = RoutedClient(LLM_POOL, "step6")
 
 MODEL_6 = BASE_MODEL
 TEMP_6 = BASE_TEMP
 MAX_TOKENS_6 = 512
+CACHE_6 = True
+BATCH_6 = True             # one relevance prompt per statement instead of one per summary
 
 # ────────────────────────────────────────────────────────────────────
 # Configuration STEP7
 # ────────────────────────────────────────────────────────────────────
 
-CLIENT_7 = openai.OpenAI(
-    base_url=OPENAI_BASE_URL,
-    api_key=BASE_API_KEY
-)
+CLIENT_7 = RoutedClient(LLM_POOL, "step7")
 
 MODEL_7 = BASE_MODEL
 TEMP_7 = BASE_TEMP
-MAX_TOKENS_7 = 512
\ No newline at end of file
+MAX_TOKENS_7 = 512
+CACHE_7 = True
+
+
+# ────────────────────────────────────────────────────────────────────
+# Configuration EMBEDDINGS (evidence pre-filter before step 5/6)
+# ────────────────────────────────────────────────────────────────────
+
+CLIENT_EMBED = RoutedClient(LLM_POOL, "embed")
+
+MODEL_EMBED = "nomic-embed-text"
+EMBED_FILTER = True
+EMBED_MIN_SIMILARITY = 0.35   # abstracts below this cosine score are dropped
+EMBED_TOP_K = 3               # at most this many abstracts per statement go on
+
+
+# ────────────────────────────────────────────────────────────────────
+# Completion helper
+# ────────────────────────────────────────────────────────────────────
+def completion_key(model: str, messages: list, temperature: float, max_tokens: int, **kwargs: Any) -> str:
+    """Content address of a chat completion request."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature,
+         "max_tokens": max_tokens, "extra": kwargs},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def seeded(temperature: float, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Request kwargs of a cached call: sampled calls get LLM_CACHE_SEED unless a seed is given."""
+    if temperature > 0 and LLM_CACHE_SEED is not None and "seed" not in kwargs:
+        return {**kwargs, "seed": LLM_CACHE_SEED}
+    return kwargs
+
+
+def chat_completion(
+    client: "openai.OpenAI",
+    model: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    use_cache: bool = False,
+    **kwargs: Any,
+) -> str:
+    """
+    Single-prompt chat completion that returns the reply text.
+    With `use_cache` the reply is memoised in LLM_CACHE, keyed by model,
+    prompt, temperature, max_tokens and any extra request kwargs; sampled
+    calls are then seeded with LLM_CACHE_SEED so the cached reply is
+    reproducible (see LLM_CACHE_BYPASS_SAMPLED).
+    Every call is traced as an "llm" span (step, model, tokens, cache hit).
+    """
+    messages = [{"role": "user", "content": prompt}]
+    cacheable = use_cache and not (LLM_CACHE_BYPASS_SAMPLED and temperature > 0)
+    if cacheable:
+        kwargs = seeded(temperature, kwargs)
+    key = completion_key(model, messages, temperature, max_tokens, **kwargs) if cacheable else None
+    with tracing.span("llm", step=getattr(client, "step", None), model=model, cache_hit=False) as sp:
+        if key:
+            hit = LLM_CACHE.get(key)
+            if hit is not None:
+                sp.set(cache_hit=True)
+                return hit
+
+        res = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs,
+        )
+        reply = res.choices[0].message.content or ""
+        usage = getattr(res, "usage", None)
+        if usage is not None:
+            sp.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        tracing.event("llm.completion", level="debug", model=model, prompt=prompt, reply=reply)
+        if key:
+            LLM_CACHE.set(key, reply)
+        return reply
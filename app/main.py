@@ -1,15 +1,96 @@
 # main.py ──────────────────────────────────────────────────────────────
+import time
+_IMPORT_T0 = time.perf_counter()   # start of the cold-start clock
+
 from fastapi import FastAPI, Body, HTTPException
-import shutil, os
+import os
 from .pipeline import run_pipeline
   # ← your existing heavy pipeline
-from .reel_utils import convert_video_to_wav  # ← helper from earlier 
+from .reel_utils import load_reel_audio
+from .step_1_audio_to_transcript import get_asr_backend, has_cached_transcript, warmup_whisper
+from .result_cache import ResultCache
+from .jobs import Job, JobManager, QueueFullError
+from .llm_parsing import parse_stats
+from .llmconfigs import LLM_HEALTH_CHECK_INTERVAL, LLM_POOL
+from . import metrics, pubmed_index, tracing
+from .cache_store import CACHES
+from .claim_store import CLAIM_STORE
+from .checkpoints import CHECKPOINTS
 from typing import Any, Dict, List
 from urllib.parse import urlparse
 import random
 import json
 from fastapi.middleware.cors import CORSMiddleware
-app = FastAPI(title="One-shot reel-to-pipeline")
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_T0
+WARMUP_IN_BACKGROUND = True   # accept requests (and /health) at once; /ready turns 200 when warm
+
+READY = threading.Event()
+STARTUP: Dict[str, Any] = {"state": "starting", "import_seconds": round(IMPORT_SECONDS, 3)}
+
+def warm_up() -> None:
+    """Load Whisper and ping the LLM backends; records how long each phase took."""
+    STARTUP["state"] = "warming"
+    try:
+        t0 = time.perf_counter()
+        STARTUP["asr_backend"] = get_asr_backend().name
+        warmup_whisper()                                   # load once per worker instead of once per request
+        STARTUP["whisper_seconds"] = round(time.perf_counter() - t0, 3)
+
+        t0 = time.perf_counter()
+        STARTUP["llm_backends"] = LLM_POOL.check_health()
+        STARTUP["llm_check_seconds"] = round(time.perf_counter() - t0, 3)
+        LLM_POOL.start_health_checks(LLM_HEALTH_CHECK_INTERVAL)
+
+        if pubmed_index.use_local():
+            STARTUP["pubmed_index_articles"] = pubmed_index.get_pubmed_index().count()
+    except Exception as exc:
+        STARTUP["state"] = "failed"
+        STARTUP["error"] = f"{type(exc).__name__}: {exc}"
+        print(f"Warm-up failed: {STARTUP['error']}")
+        return
+    STARTUP["ready_seconds"] = round(time.perf_counter() - _IMPORT_T0, 3)
+    STARTUP["state"] = "ready"
+    for phase in ("import_seconds", "whisper_seconds", "llm_check_seconds", "ready_seconds"):
+        metrics.STARTUP_SECONDS.set(STARTUP[phase], phase=phase[:-len("_seconds")])
+    READY.set()
+    print(f"Ready after {STARTUP['ready_seconds']}s (import {STARTUP['import_seconds']}s, "
+          f"whisper {STARTUP['whisper_seconds']}s, LLM check {STARTUP['llm_check_seconds']}s)")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP_IN_BACKGROUND:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    else:
+        await asyncio.to_thread(warm_up)
+    yield
+    JOBS.shutdown()
+    tracing.SINK.flush()
+
+app = FastAPI(title="One-shot reel-to-pipeline", lifespan=lifespan)
+
+RESULTS = ResultCache()   # finished + in-flight pipeline runs by reel ID
+JOBS    = JobManager()    # bounded worker pool for pipeline runs
+
+def collect_metrics() -> None:
+    """Refresh the point-in-time gauges before each /metrics scrape."""
+    jobs = JOBS.stats()
+    metrics.JOBS.set(jobs["queued"], state="queued")
+    metrics.JOBS.set(jobs["running"], state="running")
+    metrics.PIPELINES_INFLIGHT.set(RESULTS.inflight())
+    for backend in LLM_POOL.stats():
+        metrics.LLM_BACKEND_OUTSTANDING.set(backend["outstanding"], backend=backend["name"])
+        metrics.LLM_BACKEND_HEALTHY.set(int(backend["healthy"]), backend=backend["name"])
+    metrics.collect_caches([*CACHES, CLAIM_STORE])
+
+metrics.REGISTRY.on_collect(collect_metrics)
+
+SSE_POLL_INTERVAL = 0.25
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,6 +100,7 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+
 def extract_reel_id(instagram_url: str) -> str:
     """
     Return the segment that follows /reels/ in an Instagram Reel URL.
@@ -35,8 +117,36 @@ def extract_reel_id(instagram_url: str) -> str:
     except (ValueError, IndexError):
         raise HTTPException(400, "Could not extract reel ID from URL")
 
-@app.post("/process")
-async def process(payload: dict = Body(...)):
+def result_key(reel_id: str, mock: bool) -> str:
+    return f"{reel_id}|mock" if mock else reel_id
+
+def reel_audio(url: str, reel_id: str, mock: bool):
+    if mock:
+        # Mock mode: just look for a pre-made WAV named <reel_id>.wav
+        return os.path.abspath(f"{reel_id}.wav")
+    if has_cached_transcript(reel_id):
+        return None                                        # step 1 is served from TRANSCRIPT_CACHE
+    try:
+        print(f"Downloading reel audio from {url}...")
+        return load_reel_audio(url)                        # in memory, no temp files left behind
+    except RuntimeError as e:
+        raise HTTPException(400, str(e))
+
+def process_reel(url: str, reel_id: str, mock: bool, on_event=None) -> dict:
+    """Download (or mock) the reel and run the pipeline, sharing cached / in-flight runs."""
+    def compute() -> dict:
+        return run_pipeline(reel_audio(url, reel_id, mock), reel_id, on_event)
+
+    return RESULTS.get_or_compute(result_key(reel_id, mock), compute)
+
+def retry_reel(job_id: str, url: str, reel_id: str, mock: bool, on_event=None) -> dict:
+    """Resume the pipeline of job `job_id` from its checkpoints (audio only if step 1 is missing)."""
+    audio = None if CHECKPOINTS.has(job_id, "update_transcript") else reel_audio(url, reel_id, mock)
+    result = run_pipeline(audio, reel_id, on_event, job_id=job_id, resume=True)
+    RESULTS.set(result_key(reel_id, mock), result)      # replaces the failed / degraded result
+    return result
+
+def submit_reel(payload: dict) -> Job:
     print("Received payload:", payload)
     url  = payload.get("url")
     print(url)
@@ -45,24 +155,113 @@ async def process(payload: dict = Body(...)):
 
     reel_id = extract_reel_id(url)
     mock    = payload.get("mock", False)
+    try:
+        return JOBS.submit(
+            process_reel, url, reel_id, mock,
+            meta={"url": url, "reel_id": reel_id, "mock": mock},
+            key=result_key(reel_id, mock),
+            events=True,
+        )
+    except QueueFullError as e:
+        raise HTTPException(429, str(e), headers={"Retry-After": "30"})
 
-    if mock:
-        # Mock mode: just look for a pre-made WAV named <reel_id>.wav
-        wav_path = os.path.abspath(f"{reel_id}.wav")
-        tmp_dir  = os.path.dirname(wav_path)
-    else:
-        try:
-            print(f"Downloading reel from {url}...")
-            wav_path = convert_video_to_wav(url)           # your existing helper
-            tmp_dir  = os.path.dirname(wav_path)
-        except RuntimeError as e:
-            raise HTTPException(400, str(e))
+@app.post("/process")
+def process(payload: dict = Body(...)):
+    # plain `def`: FastAPI runs it in its threadpool, the pipeline itself
+    # runs on the bounded job pool
+    job = submit_reel(payload)
+    return JOBS.wait(job)
+
+@app.post("/jobs", status_code=202)
+def create_job(payload: dict = Body(...)):
+    job = submit_reel(payload)
+    return {"job_id": job.id, "status": job.status}
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown job '{job_id}'")
+    return job.to_dict()
+
+@app.post("/jobs/{job_id}/retry", status_code=202)
+def retry_job(job_id: str):
+    """Rerun a finished job from its first missing or failed step."""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown job '{job_id}'")
+    if not job.done.is_set():
+        raise HTTPException(409, f"Job '{job_id}' is still {job.status}")
+    meta = job.meta
+    checkpoint_id = meta.get("retry_of", job_id)       # retries keep resuming the original run
     try:
-        return run_pipeline(wav_path)                      # your existing inference step
-    finally:
-        if not mock:                                       # don’t delete local mocks
-            shutil.rmtree(tmp_dir, ignore_errors=True)
+        retry = JOBS.submit(
+            retry_reel, checkpoint_id, meta["url"], meta["reel_id"], meta.get("mock", False),
+            meta={**meta, "retry_of": checkpoint_id},
+            key=result_key(meta["reel_id"], meta.get("mock", False)),
+            events=True,
+        )
+    except QueueFullError as e:
+        raise HTTPException(429, str(e), headers={"Retry-After": "30"})
+    return {"job_id": retry.id, "status": retry.status, "retry_of": checkpoint_id,
+            "checkpoints": sorted(CHECKPOINTS.steps(checkpoint_id))}
+
+def sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_job(job: Job):
+    """Server-sent events: every recorded job event, then `result` or `error`."""
+    sent = 0
+    yield sse("job", {"job_id": job.id, "status": job.status})
+    while True:
+        finished = job.done.is_set()
+        events = job.events[sent:]
+        for ev in events:
+            yield sse(ev["event"], ev["data"])
+        sent += len(events)
+        if finished:
+            break
+        await asyncio.sleep(SSE_POLL_INTERVAL)
+    if job.status == "done":
+        yield sse("result", job.result)
+    else:
+        yield sse("error", {"detail": job.error})
+
+@app.post("/process/stream")
+def process_stream(payload: dict = Body(...)):
+    job = submit_reel(payload)
+    return StreamingResponse(stream_job(job), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown job '{job_id}'")
+    return StreamingResponse(stream_job(job), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "jobs": JOBS.stats(),
+        "llm_backends": LLM_POOL.stats(),
+        "parsing": parse_stats(),
+        "tracing": {"level": tracing.TRACE_LEVEL, "written": tracing.SINK.written, "dropped": tracing.SINK.dropped},
+        "checkpoints": CHECKPOINTS.stats(),
+        "startup": STARTUP,
+    }
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once Whisper is loaded and the LLM backends were pinged, 503 before."""
+    if not READY.is_set():
+        raise HTTPException(503, STARTUP)
+    return STARTUP
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # plain def: cache stats hit SQLite, keep that off the event loop
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 @app.get("/number")
 async def get_number():
@@ -0,0 +1,251 @@
+"""
+PROMETHEUS METRICS
+──────────────────
+• Counters, gauges and histograms rendered in the Prometheus text format
+  (GET /metrics) – no client library needed.
+• Step, LLM and NCBI timings come from the tracing spans (see
+  `observe_span`), so they are recorded even with TRACE_LEVEL="off".
+• Point-in-time values (queue depth, in-flight pipelines, cache hit
+  ratios, backend load) are read by collectors on every scrape.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from . import tracing
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# span names recorded as pipeline steps ("statement_lanes" = steps 3–7 in lanes mode)
+STEP_SPANS = {
+    "update_transcript", "update_statements", "update_query", "query_to_link",
+    "link_to_summary", "reduce_to_evidence", "statement_to_truthness",
+    "statement_to_score", "statement_lanes", "claim_lookup",
+}
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines of this metric (without HELP / TYPE)."""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}", *self.samples()]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: str) -> None:
+        """For counters kept elsewhere (e.g. SqliteCache.hits), copied in at scrape time."""
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_labels(self.labels, k)} {_num(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        self.set_total(value, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, counts in sorted(self._counts.items()):
+                for bound, count in zip(self.buckets, counts):
+                    le = 'le="%s"' % _num(bound)
+                    lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_num(self._sums[key])}")
+                lines.append(f"{self.name}_count{_labels(self.labels, key)} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def on_collect(self, fn: Callable[[], None]) -> None:
+        """Run `fn` before every scrape (to refresh gauges)."""
+        self.collectors.append(fn)
+
+    def render(self) -> str:
+        for fn in self.collectors:
+            try:
+                fn()
+            except Exception as exc:
+                print(f"[metrics] collector {getattr(fn, '__name__', fn)} failed: {exc}")
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ───────── pipeline ─────────
+STEP_SECONDS = REGISTRY.register(Histogram(
+    "fact_checker_step_duration_seconds", "Duration of one pipeline step (per statement in lanes mode).", ["step", "status"]))
+PIPELINE_SECONDS = REGISTRY.register(Histogram(
+    "fact_checker_pipeline_duration_seconds", "End-to-end run_pipeline duration.", ["status"]))
+PIPELINES_INFLIGHT = REGISTRY.register(Gauge(
+    "fact_checker_pipelines_inflight", "Pipeline computations currently running (after coalescing)."))
+STARTUP_SECONDS = REGISTRY.register(Gauge(
+    "fact_checker_startup_seconds", "Cold start phases (import, whisper, llm_check) and total time to ready.", ["phase"]))
+JOBS = REGISTRY.register(Gauge(
+    "fact_checker_jobs", "Jobs by state (queued = waiting for a worker).", ["state"]))
+
+# ───────── LLM ─────────
+LLM_SECONDS = REGISTRY.register(Histogram(
+    "fact_checker_llm_request_duration_seconds", "LLM chat completion latency (cache misses only).", ["step", "model"]))
+LLM_REQUESTS = REGISTRY.register(Counter(
+    "fact_checker_llm_requests_total", "LLM chat completions by cache outcome and status.", ["step", "model", "cache", "status"]))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "fact_checker_llm_tokens_total", "Tokens reported by the LLM backends.", ["step", "model", "kind"]))
+EMBED_SECONDS = REGISTRY.register(Histogram(
+    "fact_checker_embedding_request_duration_seconds", "Embedding request latency.", ["model"]))
+LLM_BACKEND_OUTSTANDING = REGISTRY.register(Gauge(
+    "fact_checker_llm_backend_outstanding", "Requests in flight per LLM backend.", ["backend"]))
+LLM_BACKEND_HEALTHY = REGISTRY.register(Gauge(
+    "fact_checker_llm_backend_healthy", "1 if the LLM backend passed its last health check.", ["backend"]))
+
+# ───────── speech recognition ─────────
+ASR_SECONDS = REGISTRY.register(Histogram(
+    "fact_checker_asr_duration_seconds", "Step 1 speech recognition latency (cache misses only).", ["backend", "model"]))
+
+# ───────── PubMed ─────────
+NCBI_SECONDS = REGISTRY.register(Histogram(
+    "fact_checker_ncbi_request_duration_seconds", "NCBI E-utilities request latency incl. retries.", ["endpoint"]))
+NCBI_ERRORS = REGISTRY.register(Counter(
+    "fact_checker_ncbi_errors_total", "NCBI E-utilities requests that failed after all retries.", ["endpoint"]))
+NCBI_RETRIES = REGISTRY.register(Counter(
+    "fact_checker_ncbi_retries_total", "Extra NCBI E-utilities attempts (429/5xx/connection errors).", ["endpoint"]))
+
+# ───────── caches ─────────
+CACHE_HITS = REGISTRY.register(Counter(
+    "fact_checker_cache_hits_total", "Cache lookups that found an entry.", ["cache"]))
+CACHE_MISSES = REGISTRY.register(Counter(
+    "fact_checker_cache_misses_total", "Cache lookups that found nothing.", ["cache"]))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "fact_checker_cache_hit_ratio", "hits / (hits + misses) since start.", ["cache"]))
+CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "fact_checker_cache_entries", "Entries currently stored.", ["cache"]))
+
+
+def observe_span(record: Dict[str, object]) -> None:
+    """tracing span listener: turn finished spans into metric samples."""
+    name = record["name"]
+    seconds = float(record["duration"])
+    status = str(record["status"])
+    if name in STEP_SPANS:
+        STEP_SECONDS.observe(seconds, step=name, status=status)
+    elif name == "pipeline":
+        PIPELINE_SECONDS.observe(seconds, status=status)
+    elif name == "llm":
+        step, model = str(record.get("step")), str(record.get("model"))
+        hit = bool(record.get("cache_hit"))
+        LLM_REQUESTS.inc(step=step, model=model, cache="hit" if hit else "miss", status=status)
+        if not hit:
+            LLM_SECONDS.observe(seconds, step=step, model=model)
+        for kind in ("prompt", "completion"):
+            tokens = record.get(f"{kind}_tokens")
+            if tokens:
+                LLM_TOKENS.inc(float(tokens), step=step, model=model, kind=kind)
+    elif name == "asr":
+        ASR_SECONDS.observe(seconds, backend=str(record.get("backend")), model=str(record.get("model")))
+    elif name == "embed":
+        EMBED_SECONDS.observe(seconds, model=str(record.get("model")))
+    elif name == "ncbi":
+        endpoint = str(record.get("endpoint"))
+        NCBI_SECONDS.observe(seconds, endpoint=endpoint)
+        attempts = int(record.get("attempts") or 1)
+        if attempts > 1:
+            NCBI_RETRIES.inc(attempts - 1, endpoint=endpoint)
+        if status != "ok":
+            NCBI_ERRORS.inc(endpoint=endpoint)
+
+
+tracing.add_span_listener(observe_span)
+
+
+def collect_caches(caches: Iterable[object]) -> None:
+    """Copy SqliteCache.stats() into the cache metrics."""
+    for cache in caches:
+        st = cache.stats()
+        ns = st["namespace"]
+        CACHE_HITS.set_total(st["hits"], cache=ns)
+        CACHE_MISSES.set_total(st["misses"], cache=ns)
+        CACHE_HIT_RATIO.set(st["hit_ratio"], cache=ns)
+        CACHE_ENTRIES.set(st["size"], cache=ns)
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,143 @@
+"""
+NCBI E-UTILITIES CLIENT
+───────────────────────
+• One pooled keep-alive `requests.Session` for every esearch / efetch call.
+• Process-wide token bucket that keeps all concurrent pipelines under
+  NCBI's limit (3 req/s, 10 req/s with an API key).
+• Retries 429 / 5xx / connection errors with exponential backoff
+  (honours Retry-After); every attempt takes a token.
+• `api_key`, `tool` and `email` are sent with each request when set.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import tracing
+
+NCBI_EUTILS = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+NCBI_API_KEY = os.environ.get("NCBI_API_KEY")
+NCBI_TOOL = os.environ.get("NCBI_TOOL", "fact_checker")
+NCBI_EMAIL = os.environ.get("NCBI_EMAIL")
+
+NCBI_RATE = 10.0 if NCBI_API_KEY else 3.0    # requests per second
+NCBI_BURST = 3
+NCBI_TIMEOUT = (5, 30)                        # connect, read seconds
+NCBI_MAX_RETRIES = 4
+NCBI_BACKOFF = 0.5                            # 0.5, 1, 2, 4 s
+NCBI_POOL_SIZE = 16
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class NCBIClient:
+    def __init__(
+        self,
+        base_url: str = NCBI_EUTILS,
+        api_key: Optional[str] = NCBI_API_KEY,
+        tool: Optional[str] = NCBI_TOOL,
+        email: Optional[str] = NCBI_EMAIL,
+        rate: float = NCBI_RATE,
+        burst: int = NCBI_BURST,
+        timeout: Any = NCBI_TIMEOUT,
+        max_retries: int = NCBI_MAX_RETRIES,
+        backoff: float = NCBI_BACKOFF,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(rate, burst)
+        self.common: Dict[str, str] = {
+            k: v for k, v in (("api_key", api_key), ("tool", tool), ("email", email)) if v
+        }
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=NCBI_POOL_SIZE, pool_maxsize=NCBI_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, endpoint: str, params: Dict[str, Any], method: str = "GET") -> requests.Response:
+        """Rate-limited call to `<base_url>/<endpoint>` with retry + backoff (traced as an "ncbi" span)."""
+        with tracing.span("ncbi", endpoint=endpoint, attempts=0) as sp:
+            return self._request(endpoint, params, method, sp)
+
+    def _request(self, endpoint: str, params: Dict[str, Any], method: str, sp: tracing.Span) -> requests.Response:
+        url = f"{self.base_url}/{endpoint}"
+        params = {**self.common, **params}
+        for attempt in range(self.max_retries + 1):
+            sp.set(attempts=attempt + 1)
+            self.bucket.acquire()
+            delay = self.backoff * (2 ** attempt)
+            try:
+                if method == "POST":
+                    resp = self.session.post(url, data=params, timeout=self.timeout)
+                else:
+                    resp = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == self.max_retries:
+                    raise
+                print(f"[NCBI] {endpoint} failed ({exc}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            sp.set(http_status=resp.status_code)
+            if resp.status_code in RETRY_STATUS and attempt < self.max_retries:
+                retry_after = resp.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+                print(f"[NCBI] {endpoint} HTTP {resp.status_code}, retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            resp.raise_for_status()
+            return resp
+        raise RuntimeError("unreachable")
+
+    def esearch(self, term: str, retmax: int = 4) -> List[str]:
+        """PMIDs matching `term` (PubMed relevance order)."""
+        params = {"db": "pubmed", "term": term, "retmax": retmax, "retmode": "json"}
+        return self.request("esearch.fcgi", params).json()["esearchresult"]["idlist"]
+
+    def efetch_xml(self, pmids: List[str]) -> bytes:
+        """PubmedArticleSet XML for `pmids`; POST keeps long id lists out of the URL."""
+        params = {"db": "pubmed", "id": ",".join(pmids), "retmode": "xml"}
+        return self.request("efetch.fcgi", params, method="POST").content
+
+
+_CLIENT: Optional[NCBIClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_ncbi_client() -> NCBIClient:
+    """Process-wide client, so every pipeline shares one pool and one rate limit."""
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                _CLIENT = NCBIClient()
+    return _CLIENT
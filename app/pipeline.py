@@ -1,212 +1,260 @@
 # pipeline.py
-import os, re, sys
+import os, re
 import time
 from datetime import datetime
 import json
-from .step_1_audio_to_transcript import update_transcript
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .step_1_audio_to_transcript import AudioInput, update_transcript
 from .step_2_transcript_to_statement import update_statements
 from .step_3_statement_to_query import update_query
 from .step_4_query_to_link import query_to_link
 from .step_5_link_to_summary import link_to_summary
 from .step_6_reduce_to_evidence import reduce_to_evidence
-from .step_7_statement_to_truthness import statement_to_truthness
+from .step_7_statement_to_truthness import failed_statements, statement_to_truthness
 from .step_8_statment_to_score import statement_to_score
+from .claim_store import CLAIM_STORE, reuse_known_claims
+from .checkpoints import CHECKPOINTS
+from . import tracing
 
 from .preprompts import *
 from .llmconfigs import *
 
-class TeeStream:
+PIPELINE_MODE = "lanes"   # "stages": step by step for all statements | "lanes": steps 3–7 per statement
+LANE_WORKERS  = 4         # statements processed at the same time in "lanes" mode
+VERDICT_STEPS = ("statement_lanes", "statement_to_truthness")   # rerun on resume if a verdict failed
+
+def run_statement_lanes(
+    data: Dict[str, Any],
+    on_verdict: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
     """
-    Ein „Tee“, der in mehrere Streams gleichzeitig schreibt.
+    Steps 3–7 with one independent lane per statement: each statement runs
+    query → links → summaries → relevance → verdict on its own, and up to
+    LANE_WORKERS statements run at the same time. Step 5 summaries of all
+    lanes share one pool (MAX_WORKERS_5); the abstracts are fetched with one
+    efetch per lane rather than one per reel.
     """
-    def __init__(self, *streams):
-        self._streams = streams
-
-    def write(self, data):
-        for s in self._streams:
-            s.write(data)
-
-    def flush(self):
-        for s in self._streams:
-            s.flush()
-
-def run_pipeline(tmp_path: str) -> dict:
+    transcript = data.get("transcript", "")
+
+    def lane(stmt: Dict[str, Any]) -> None:
+        # the step functions mutate the statement dicts in place
+        with tracing.span("lane", statement_id=stmt.get("id")):
+            sub = {"transcript": transcript, "statements": [stmt]}
+            for step in (update_query, query_to_link, link_to_summary, reduce_to_evidence):
+                with tracing.span(step.__name__):
+                    sub = step(sub)
+            with tracing.span("statement_to_truthness"):
+                statement_to_truthness(sub, on_verdict=on_verdict)
+
+    statements = data.get("statements", [])
+    if statements:
+        with ThreadPoolExecutor(max_workers=max(1, min(LANE_WORKERS, len(statements)))) as pool:
+            list(pool.map(tracing.propagate(lane), statements))
+
+    data["generated_at"] = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    return data
+
+def run_pipeline(
+    tmp_path: Optional[AudioInput],
+    reel_id: Optional[str] = None,
+    on_event: Optional[Callable[[str, Any], None]] = None,
+    job_id: Optional[str] = None,
+    resume: bool = False,
+) -> dict:
     """
     1) Transcribe with Whisper
     2) Feed the transcript to an LLM (e.g. fact-check, summary, follow-up Q&A…)
     3) Return a dict you’ll JSON-encode later
-    """
 
-    # ─────────────────────────────────────────────────────────────────────────────
-    # ❶ Log-Datei erzeugen und stdout/stderr „teeben“ (nur Datum + Stunden+Minuten)
-    # ─────────────────────────────────────────────────────────────────────────────
-    # Format: YYYYMMDD_HHMM
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    log_filename = f"log_{timestamp}.txt"
-    log_file = open(log_filename, "w", encoding="utf-8")
+    `on_event(event, data)` receives partial results as they become available:
+    "transcript", "statements", one "verdict" per statement and a "step"
+    event (name + seconds) after every step.
 
-    original_stdout = sys.stdout
-    original_stderr = sys.stderr
+    `tmp_path` is an audio file or 16 kHz mono float32 samples
+    (reel_utils.load_reel_audio); it may be None when resuming past step 1
+    or when the reel's transcript is cached.
 
-    tee = TeeStream(original_stdout, log_file)
-    sys.stdout = tee
-    sys.stderr = tee
+    The run is traced (see tracing.py) under the current request id, or a
+    new one when called outside a job. `data` is checkpointed after every
+    step under `job_id` (default: that request id); with `resume=True` the
+    run continues from the first missing or failed step (see checkpoints.py).
+    """
+    def emit(event: str, payload: Any) -> None:
+        if on_event:
+            on_event(event, payload)
+
+    def emit_verdict(stmt: Dict[str, Any]) -> None:
+        emit("verdict", {k: stmt.get(k) for k in ("id", "text", "verdict", "confidence")})
 
     # ─────────────────────────────────────────────────────────────────────────────
-    # ❶ Print LLM Configs
+    # ❶ LLM configs + preprompts → trace (debug level only)
     # ─────────────────────────────────────────────────────────────────────────────
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- LLM Configs --- ")
-    print(" \n --------------------------------------------------------------- \n")
-
-    # Allgemeine Basis-Settings
-    print(f"BASE_URL   : {OPENAI_BASE_URL}")
-    print(f"API_KEY    : {BASE_API_KEY}")
-    print(f"BASE_MODEL : {BASE_MODEL}")
-    print(f"BASE_TEMP  : {BASE_TEMP}\n")
-
-    # STEP2
-    print(" STEP2:")
-    print(f"   MODEL      = {MODEL_2}")
-    print(f"   TEMP       = {TEMP_2}")
-    print(f"   MAX_TOKENS = {MAX_TOKENS_2}\n")
-
-    # STEP3
-    print(" STEP3:")
-    print(f"   MODEL      = {MODEL_3}")
-    print(f"   TEMP       = {TEMP_3}")
-    print(f"   MAX_TOKENS = {MAX_TOKENS_3}\n")
-
-    # STEP5
-    print(" STEP5:")
-    print(f"   MODEL      = {MODEL_5}")
-    print(f"   TEMP       = {TEMP_5}")
-    print(f"   MAX_TOKENS = {MAX_TOKENS_5}\n")
-
-    # STEP6
-    print(" STEP6:")
-    print(f"   MODEL      = {MODEL_6}")
-    print(f"   TEMP       = {TEMP_6}")
-    print(f"   MAX_TOKENS = {MAX_TOKENS_6}\n")
-
-    # STEP7
-    print(" STEP7:")
-    print(f"   MODEL      = {MODEL_7}")
-    print(f"   TEMP       = {TEMP_7}")
-    print(f"   MAX_TOKENS = {MAX_TOKENS_7}\n")
+    with tracing.request(tracing.request_id()) as rid:
+        if tracing.enabled("debug"):
+            tracing.event(
+                "pipeline.config",
+                level="debug",
+                base_url=OPENAI_BASE_URL,
+                base_model=BASE_MODEL,
+                base_temp=BASE_TEMP,
+                llm_cache=LLM_CACHE_ENABLED,
+                llm_cache_bypass_sampled=LLM_CACHE_BYPASS_SAMPLED,
+                llm_cache_seed=LLM_CACHE_SEED,
+                mode=PIPELINE_MODE,
+                lane_workers=LANE_WORKERS,
+                steps={
+                    "step2": {"model": MODEL_2, "temp": TEMP_2, "max_tokens": MAX_TOKENS_2},
+                    "step3": {"model": MODEL_3, "temp": TEMP_3, "max_tokens": MAX_TOKENS_3},
+                    "step5": {"model": MODEL_5, "temp": TEMP_5, "max_tokens": MAX_TOKENS_5, "max_workers": MAX_WORKERS_5},
+                    "embed": {"model": MODEL_EMBED, "filter": EMBED_FILTER,
+                              "min_similarity": EMBED_MIN_SIMILARITY, "top_k": EMBED_TOP_K},
+                    "step6": {"model": MODEL_6, "temp": TEMP_6, "max_tokens": MAX_TOKENS_6, "batch": BATCH_6},
+                    "step7": {"model": MODEL_7, "temp": TEMP_7, "max_tokens": MAX_TOKENS_7},
+                },
+                preprompts={
+                    "step2": PROMPT_TMPL_S2,
+                    "step3": PROMPT_TMPL_S3,
+                    "step5": PROMPT_TMPL_S5,
+                    "step6": PROMPT_TMPL_S6,
+                    "step6_batch": PROMPT_TMPL_S6_BATCH,
+                    "step7": PROMPT_TMPL_S7,
+                },
+            )
+        with tracing.span("pipeline", reel_id=reel_id, mode=PIPELINE_MODE) as sp:
+            scores = _run_steps(tmp_path, reel_id, emit, emit_verdict, job_id or rid, resume)
+            sp.set(statements=len(scores.get("statements", [])), overall=scores.get("overall_truthiness"))
+    return scores
 
 
-    # ─────────────────────────────────────────────────────────────────────────────
-    # ❶ Print LLM Preprompts
-    # ─────────────────────────────────────────────────────────────────────────────
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- LLM Preprompts --- ")
-    print(" \n --------------------------------------------------------------- \n")
-
-    # STEP2
-    print("Preprompt STEP2:")
-    print(PROMPT_TMPL_S2)
-    print("\n\n")
-    # STEP3
-    print("Prepromt STEP3:")
-    print(PROMPT_TMPL_S3)
-    print("\n\n")
-    # STEP5
-    print("Preprompt STEP5:")
-    print(PROMPT_TMPL_S5)
-    print("\n\n")
-    # STEP6
-    
-    print("Preprompt STEP6:")
-    print(PROMPT_TMPL_S6)
-    print("\n\n")
-
-    # STEP7
-    print("Prepromt STEP7:")
-    print(PROMPT_TMPL_S7)
-    print("\n\n")
+STAGE_STEPS = (update_query, query_to_link, link_to_summary, reduce_to_evidence, statement_to_truthness)
+
 
+def pending_statements(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Statements that still need steps 3–7 (not answered from the claim store)."""
+    return [s for s in data.get("statements", []) if "reused_from" not in s]
 
+
+def _run_steps(
+    tmp_path: Optional[AudioInput],
+    reel_id: Optional[str],
+    emit: Callable[[str, Any], None],
+    emit_verdict: Callable[[Dict[str, Any]], None],
+    job_id: str,
+    resume: bool,
+) -> Dict[str, Any]:
     # ─────────────────────────────────────────────────────────────────────────────
-    # ❷ Pipeline ausführen (alle print() und Fehlermeldungen gehen jetzt in Terminal UND Logdatei)
+    # ❷ Pipeline ausführen (jeder Step ist ein Span im Trace + ein Checkpoint)
     # ─────────────────────────────────────────────────────────────────────────────
     start = time.time()
-
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- Step1 --- ")
-    print(" \n --------------------------------------------------------------- \n")
-    t0 = time.time()
-    transcript = update_transcript("app/json_example.json", tmp_path)
-    t1 = time.time()
-
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- Step2 --- ")
-    print(" \n --------------------------------------------------------------- \n")
-    statments = update_statements(transcript)
-    t2 = time.time()
-
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- Step3 --- ")
-    print(" \n --------------------------------------------------------------- \n")
-    query = update_query(statments)
-    t3 = time.time()
-
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- Step4 --- ")
-    print(" \n --------------------------------------------------------------- \n")
-    link = query_to_link(query)
-    t4 = time.time()
-
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- Step5 --- ")
-    print(" \n --------------------------------------------------------------- \n")
-    summary = link_to_summary(link)
-    t5 = time.time()
-
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- Step6 --- ")
-    print(" \n --------------------------------------------------------------- \n")
-    evidence = reduce_to_evidence(summary)
-    t6 = time.time()
-
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- Step7 --- ")
-    print(" \n --------------------------------------------------------------- \n")
-    truthness = statement_to_truthness(evidence)
-    t7 = time.time()
-
-    print(" \n\n\n\n\n\n  --------------------------------------------------------------- \n")
-    print(" --- Step8 --- ")
-    print(" \n --------------------------------------------------------------- \n")
-    scores = statement_to_score(truthness)
-    t8 = time.time()
-
-    elapsed = t8 - start
-
-    print(" \n\n\n\n\n\n --------------------------------------------------------------- \n")
-    print(" --- Runtime Analysis ---")
-    print(" \n --------------------------------------------------------------- \n")
-    print(f"update_transcript: {t1 - t0:.6f} seconds")
-    print(f"update_statements: {t2 - t1:.6f} seconds")
-    print(f"update_query: {t3 - t2:.6f} seconds")
-    print(f"query_to_link: {t4 - t3:.6f} seconds")
-    print(f"link_to_summary: {t5 - t4:.6f} seconds")
-    print(f"reduce_to_evidence: {t6 - t5:.6f} seconds")
-    print(f"statement_to_truthness: {t7 - t6:.6f} seconds")
-    print(f"statement_to_score: {t8 - t7:.6f} seconds")
-    print(f"Total elapsed time: {elapsed:.6f} seconds")
-
-
-    print(" \n\n\n\n\n\n --------------------------------------------------------------- \n")
-    print(" --- Final Output (JSON) ---")
-    print(" \n --------------------------------------------------------------- \n")
-    print(scores)
+    timings: Dict[str, float] = {}
+
+    def timed(name: str, fn: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        t0 = time.time()
+        with tracing.span(name):
+            out = fn(*args, **kwargs)
+        timings[name] = time.time() - t0
+        emit("step", {"step": name, "seconds": round(timings[name], 3)})
+        return out
+
+    def transcribe(_: Any) -> Dict[str, Any]:
+        out = update_transcript("app/json_example.json", tmp_path, reel_id)
+        emit("transcript", out["transcript"])
+        return out
+
+    def statements(data: Dict[str, Any]) -> Dict[str, Any]:
+        out = update_statements(data)
+        emit("statements", [{"id": st["id"], "text": st["text"]} for st in out["statements"]])
+        return out
+
+    def claim_lookup(data: Dict[str, Any]) -> Dict[str, Any]:
+        # claims seen before (claim store) keep their verdict and skip steps 3–7
+        reuse_known_claims(data, on_verdict=emit_verdict)
+        return data
+
+    def per_claim(step: Callable[..., Dict[str, Any]], last: bool = False, **kwargs: Any) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        def run(data: Dict[str, Any]) -> Dict[str, Any]:
+            todo = pending_statements(data)
+            if todo:
+                pending = {**data, "statements": todo}   # same statement dicts, mutated in place
+                pending = step(pending, **kwargs)
+                data.update({k: v for k, v in pending.items() if k != "statements"})
+                if last:
+                    CLAIM_STORE.add_many(todo)
+            return data
+        return run
+
+    if PIPELINE_MODE == "lanes":
+        claim_steps = [("statement_lanes", per_claim(run_statement_lanes, last=True, on_verdict=emit_verdict))]
+    else:
+        claim_steps = [(step.__name__, per_claim(step)) for step in STAGE_STEPS[:-1]]
+        claim_steps.append(("statement_to_truthness", per_claim(statement_to_truthness, last=True, on_verdict=emit_verdict)))
+    steps = [
+        ("update_transcript", transcribe),
+        ("update_statements", statements),
+        ("claim_lookup", claim_lookup),
+        *claim_steps,
+        ("statement_to_score", statement_to_score),
+    ]
+    names = [name for name, _ in steps]
+
+    data: Dict[str, Any] = {}
+    first = 0
+    if resume and CHECKPOINTS.enabled:
+        first, data = _resume_point(job_id, names, emit, emit_verdict)
+    elif CHECKPOINTS.enabled:
+        CHECKPOINTS.clear(job_id)
+
+    for name, fn in steps[first:]:
+        data = timed(name, fn, data)
+        if CHECKPOINTS.enabled:
+            CHECKPOINTS.save(job_id, name, data)
+    scores = data
+
+    # a clean run needs no checkpoints; one with failed verdicts stays resumable
+    if CHECKPOINTS.enabled and not failed_statements(scores):
+        CHECKPOINTS.clear(job_id)
 
     # ─────────────────────────────────────────────────────────────────────────────
-    # ❸ Am Ende: Streams zurücksetzen und Logdatei schließen
+    # ❸ Runtime Analysis
     # ─────────────────────────────────────────────────────────────────────────────
-    sys.stdout = original_stdout
-    sys.stderr = original_stderr
-    log_file.close()
-
+    elapsed = time.time() - start
+    print(" | ".join(f"{name}: {seconds:.2f}s" for name, seconds in timings.items()) + f" | total: {elapsed:.2f}s")
+    tracing.event("pipeline.result", level="debug", result=scores)
     return scores
+
+
+def _resume_point(
+    job_id: str,
+    names: List[str],
+    emit: Callable[[str, Any], None],
+    emit_verdict: Callable[[Dict[str, Any]], None],
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Index of the first step to run and its input: the first step without a
+    checkpoint, or the verdict step if any of its verdicts failed (it then
+    reruns from the step before; successful LLM calls come from the cache).
+    """
+    data: Dict[str, Any] = {}
+    first = 0
+    for i, name in enumerate(names):
+        saved = CHECKPOINTS.load(job_id, name)
+        if saved is None or (name in VERDICT_STEPS and failed_statements(saved)):
+            break
+        data, first = saved, i + 1
+    CHECKPOINTS.discard(job_id, names[first:])
+    if first == 0:
+        return 0, {}
+
+    CHECKPOINTS.resumed += 1
+    tracing.event("pipeline.resume", job_id=job_id, after=names[first - 1])
+    emit("resume", {"job_id": job_id, "after": names[first - 1]})
+    # replay what the earlier run already reported
+    if "transcript" in data:
+        emit("transcript", data["transcript"])
+    if data.get("statements"):
+        emit("statements", [{"id": st["id"], "text": st["text"]} for st in data["statements"]])
+        for stmt in data["statements"]:
+            if stmt.get("verdict") is not None:
+                emit_verdict(stmt)
+    return first, data
@@ -20,7 +20,7 @@ SELECTION RULES
 4. Merge duplicate / near-duplicate claims into one concise statement.
 
 STRICT OUTPUT  
-A valid JSON array with 1–3 strings.  
+A valid JSON object {{"claims": [...]}} whose "claims" array holds 1–3 strings.  
 No commentary, no extra keys, no markdown.
 """
 
@@ -76,6 +76,10 @@ AND
 • Begins with a letter (A–Z or a–z) and contains no leading/trailing spaces.  
 • Contains no line breaks or extra whitespace.
 
+STRICT OUTPUT  
+A valid JSON object {{"query": "<the query string or NONE>"}}.  
+No commentary, no extra keys, no markdown.
+
 CLAIM:
 {claim}
 """
@@ -114,6 +118,25 @@ Does the summary *directly relate to or support* the statement?
 Respond with only: yes   |   no
 """
 
+# ────────────────────────────────────────────────────────────────────
+# Step6 (batched): judge all evidence summaries of one statement at once
+# ────────────────────────────────────────────────────────────────────
+PROMPT_TMPL_S6_BATCH = """
+You are verifying whether evidence summaries actually address a claim.  
+Think (silently) first; then answer.
+
+STATEMENT: {statement}
+
+EVIDENCE SUMMARIES:
+{evidence_list}
+
+For EACH numbered summary decide: does it *directly relate to or support* the statement?
+
+STRICT OUTPUT  
+A valid JSON array with exactly {count} strings, one per summary in the same order, each "yes" or "no".  
+No commentary, no extra keys, no markdown.
+"""
+
 # ────────────────────────────────────────────────────────────────────
 # Step7: Statement rating
 # ────────────────────────────────────────────────────────────────────
@@ -135,7 +158,6 @@ Inclunding the Scientific Evidence together with Common Sense and the Context of
 
 give the final response in the following format:
 
-STRICT OUTPUT – exactly two lines, nothing else:
-VERDICT: true|false|uncertain
-FINALSCORE: <probability 0.00–1.00>
+STRICT OUTPUT – a valid JSON object, nothing else:
+{{"verdict": "true|false|uncertain", "finalscore": <probability 0.00–1.00>}}
 """
\ No newline at end of file
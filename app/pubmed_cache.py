@@ -0,0 +1,40 @@
+"""
+PUBMED CACHE
+────────────
+• esearch results (step 4) keyed by the normalised query string.
+• efetch abstracts (step 5) keyed by PMID; PMIDs efetch returned no
+  abstract for are remembered separately, for a shorter time.
+• Both live in the shared on-disk SqliteCache, so warm requests skip NCBI.
+"""
+
+import re
+
+from .cache_store import SqliteCache
+
+PUBMED_CACHE_ENABLED = True
+ESEARCH_TTL = 7 * 24 * 3600          # search results drift as PubMed grows
+EFETCH_TTL = 90 * 24 * 3600          # abstracts practically never change
+EFETCH_EMPTY_TTL = 7 * 24 * 3600     # abstracts are sometimes added after indexing
+ESEARCH_MAX_ENTRIES = 20_000
+EFETCH_MAX_ENTRIES = 100_000
+
+ESEARCH_CACHE = SqliteCache(
+    "pubmed_esearch", ttl=ESEARCH_TTL, max_entries=ESEARCH_MAX_ENTRIES, enabled=PUBMED_CACHE_ENABLED
+)
+EFETCH_CACHE = SqliteCache(
+    "pubmed_efetch", ttl=EFETCH_TTL, max_entries=EFETCH_MAX_ENTRIES, enabled=PUBMED_CACHE_ENABLED
+)
+EFETCH_EMPTY_CACHE = SqliteCache(
+    "pubmed_efetch_empty", ttl=EFETCH_EMPTY_TTL, max_entries=EFETCH_MAX_ENTRIES, enabled=PUBMED_CACHE_ENABLED
+)
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalise_query(query: str) -> str:
+    """Collapse whitespace so trivially different LLM outputs share one entry."""
+    return WHITESPACE_RE.sub(" ", query).strip()
+
+
+def esearch_key(query: str, retmax: int) -> str:
+    return f"{retmax}|{normalise_query(query)}"
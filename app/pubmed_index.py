@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+LOCAL PUBMED INDEX
+──────────────────
+• Offline replacement for NCBI esearch/efetch: one SQLite file with the
+  articles (PMID, title, abstract, MeSH headings) and an FTS5 index over
+  them, ranked with bm25 (title and MeSH weigh more than the abstract).
+• `ingest` streams PubMed baseline / update files (*.xml or *.xml.gz);
+  DeleteCitation entries remove articles again.
+• Step 3 Boolean queries are translated to FTS5: AND / OR / NOT (left to
+  right, as PubMed does), quoted phrases, trailing * and the field tags
+  [tiab] [ti] [ab] [MeSH]/[mh]/[majr] [tw]/[all]; other tags (dates,
+  publication types, …) are ignored. MeSH terms are not exploded.
+• PUBMED_BACKEND="local" makes steps 4 and 5 use the index instead of
+  E-utilities.
+
+    python -m app.pubmed_index ingest pubmed25n0001.xml.gz pubmed25n0002.xml.gz
+    python -m app.pubmed_index search '("Fasting"[MeSH] OR fasting[tiab]) AND ketones[tiab]'
+"""
+
+import argparse
+import gzip
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .cache_store import CACHE_DIR
+from . import tracing
+
+PUBMED_BACKEND = os.environ.get("FACT_CHECKER_PUBMED_BACKEND", "eutils")   # "eutils" | "local"
+PUBMED_INDEX_PATH = os.environ.get("FACT_CHECKER_PUBMED_INDEX", os.path.join(CACHE_DIR, "pubmed_index.sqlite3"))
+INGEST_BATCH = 5_000
+MMAP_SIZE = 1 << 30           # map up to 1 GiB of the index into memory for reads
+BM25_WEIGHTS = (10.0, 1.0, 5.0)   # title, abstract, mesh
+
+# PubMed field tag → FTS5 column filter (None = all columns)
+FIELD_COLUMNS: Dict[str, Optional[str]] = {
+    "tiab": "{title abstract}", "title/abstract": "{title abstract}",
+    "ti": "title", "title": "title",
+    "ab": "abstract", "abstract": "abstract",
+    "mesh": "mesh", "mh": "mesh", "mesh terms": "mesh", "majr": "mesh", "mesh major topic": "mesh",
+    "tw": None, "text word": None, "all": None, "all fields": None,
+}
+
+TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|\[([^\]]*)\]|([^\s()"\[\]]+))')
+OPERATORS = {"AND", "OR", "NOT"}
+
+
+# ───────── query translation ─────────
+def _tokens(query: str) -> List[Tuple[str, str]]:
+    out: List[Tuple[str, str]] = []
+    for m in TOKEN_RE.finditer(query):
+        lpar, rpar, phrase, tag, word = m.groups()
+        if lpar:
+            out.append(("(", lpar))
+        elif rpar:
+            out.append((")", rpar))
+        elif phrase is not None:
+            out.append(("phrase", phrase))
+        elif tag is not None:
+            out.append(("tag", tag.strip().lower()))
+        elif word:
+            out.append(("op", word) if word in OPERATORS else ("word", word))
+    return out
+
+
+def _fts_term(text: str, tag: Optional[str]) -> Optional[str]:
+    """One (possibly multi-word) term with its field tag → FTS5 expression, None if unsupported."""
+    if tag is not None and tag not in FIELD_COLUMNS:
+        return None
+    prefix = text.endswith("*")
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    expr = '"' + " ".join(words) + '"' + ("*" if prefix else "")
+    column = FIELD_COLUMNS.get(tag) if tag else None
+    return f"{column} : {expr}" if column else expr
+
+
+class _Parser:
+    """PubMed Boolean syntax → FTS5 MATCH string; terms FTS5 cannot express are dropped."""
+
+    def __init__(self, query: str):
+        self.toks = _tokens(query)
+        self.pos = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.toks[self.pos] if self.pos < len(self.toks) else None
+
+    def take(self) -> Tuple[str, str]:
+        tok = self.toks[self.pos]
+        self.pos += 1
+        return tok
+
+    def expr(self) -> Optional[str]:
+        # PubMed evaluates operators left to right without precedence
+        left = self.sequence()
+        while self.peek() and self.peek()[0] == "op":
+            op = self.take()[1]
+            right = self.sequence()
+            if right is None:
+                continue
+            if left is None:
+                left = None if op == "NOT" else right
+                continue
+            left = f"({left} {op} {right})"
+        return left
+
+    def sequence(self) -> Optional[str]:
+        # adjacent terms without an operator are ANDed
+        parts = []
+        while self.peek() and self.peek()[0] in ("(", "phrase", "word"):
+            part = self.primary()
+            if part is not None:
+                parts.append(part)
+        if not parts:
+            return None
+        return parts[0] if len(parts) == 1 else "(" + " AND ".join(parts) + ")"
+
+    def primary(self) -> Optional[str]:
+        kind, value = self.take()
+        if kind == "(":
+            inner = self.expr()
+            if self.peek() and self.peek()[0] == ")":
+                self.take()
+            return f"({inner})" if inner else None
+        if kind == "phrase":
+            return _fts_term(value, self._tag())
+        # a run of bare words followed by a tag is one tagged phrase
+        words = [value]
+        while self.peek() and self.peek()[0] == "word":
+            words.append(self.take()[1])
+        tag = self._tag()
+        if tag is not None:
+            return _fts_term(" ".join(words), tag)
+        terms = [t for t in (_fts_term(w, None) for w in words) if t]
+        if not terms:
+            return None
+        return terms[0] if len(terms) == 1 else "(" + " AND ".join(terms) + ")"
+
+    def _tag(self) -> Optional[str]:
+        if self.peek() and self.peek()[0] == "tag":
+            return self.take()[1]
+        return None
+
+
+def to_fts_query(query: str) -> str:
+    """Translate a PubMed query to FTS5 syntax ("" if nothing searchable is left)."""
+    parser = _Parser(query)
+    out = parser.expr() or ""
+    # stray ")" or trailing junk: parse what follows as further ANDed terms
+    while parser.peek():
+        parser.take()
+        more = parser.expr()
+        if more:
+            out = f"({out} AND {more})" if out else more
+    return out
+
+
+# ───────── baseline XML ─────────
+def _text(el: Optional[ET.Element]) -> str:
+    return "".join(el.itertext()).strip() if el is not None else ""
+
+
+def parse_article(article: ET.Element) -> Optional[Dict[str, Any]]:
+    citation = article.find("MedlineCitation")
+    if citation is None:
+        return None
+    pmid = _text(citation.find("PMID"))
+    if not pmid.isdigit():
+        return None
+    sections = []
+    for sec in citation.findall("./Article/Abstract/AbstractText"):
+        text = _text(sec)
+        if text:
+            label = sec.get("Label")
+            sections.append(f"{label}: {text}" if label else text)
+    year = _text(citation.find("./Article/Journal/JournalIssue/PubDate/Year"))
+    return {
+        "pmid": int(pmid),
+        "title": _text(citation.find("./Article/ArticleTitle")),
+        "abstract": " ".join(sections),
+        "mesh": "; ".join(_text(d) for d in citation.findall("./MeshHeadingList/MeshHeading/DescriptorName")),
+        "year": int(year) if year.isdigit() else None,
+    }
+
+
+def iter_baseline(path: str) -> Iterator[Tuple[str, Any]]:
+    """Stream ("article", dict) and ("delete", pmid) records from one PubMed XML(.gz) file."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as fh:
+        for _, el in ET.iterparse(fh, events=("end",)):
+            if el.tag == "PubmedArticle":
+                art = parse_article(el)
+                if art:
+                    yield "article", art
+                el.clear()
+            elif el.tag == "DeleteCitation":
+                for pmid in el.findall("PMID"):
+                    if _text(pmid).isdigit():
+                        yield "delete", int(_text(pmid))
+                el.clear()
+
+
+# ───────── index ─────────
+class PubMedIndex:
+    def __init__(self, path: str = PUBMED_INDEX_PATH):
+        self.path = path
+        self._local = threading.local()      # one read connection per thread
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                " pmid INTEGER PRIMARY KEY, title TEXT, abstract TEXT, mesh TEXT, year INTEGER);"
+                "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+                " title, abstract, mesh, content='articles', content_rowid='pmid',"
+                " tokenize='porter unicode61');"
+            )
+            self._local.conn = conn
+        return conn
+
+    def count(self) -> int:
+        (n,) = self._db().execute("SELECT COUNT(*) FROM articles").fetchone()
+        return n
+
+    # ───────── writes ─────────
+    def _remove(self, db: sqlite3.Connection, pmids: Sequence[int]) -> None:
+        for pmid in pmids:
+            row = db.execute("SELECT title, abstract, mesh FROM articles WHERE pmid = ?", (pmid,)).fetchone()
+            if row is None:
+                continue
+            db.execute(
+                "INSERT INTO articles_fts(articles_fts, rowid, title, abstract, mesh) VALUES ('delete', ?, ?, ?, ?)",
+                (pmid, *row),
+            )
+            db.execute("DELETE FROM articles WHERE pmid = ?", (pmid,))
+
+    def add_articles(self, articles: Sequence[Dict[str, Any]]) -> None:
+        """Insert or replace articles (newer baseline/update files win)."""
+        db = self._db()
+        with db:
+            self._remove(db, [a["pmid"] for a in articles])
+            db.executemany(
+                "INSERT INTO articles (pmid, title, abstract, mesh, year) VALUES (:pmid, :title, :abstract, :mesh, :year)",
+                articles,
+            )
+            db.executemany(
+                "INSERT INTO articles_fts (rowid, title, abstract, mesh) VALUES (:pmid, :title, :abstract, :mesh)",
+                articles,
+            )
+
+    def delete(self, pmids: Sequence[int]) -> None:
+        db = self._db()
+        with db:
+            self._remove(db, pmids)
+
+    def ingest(self, paths: Iterable[str], batch_size: int = INGEST_BATCH) -> Dict[str, int]:
+        added = deleted = 0
+        for path in paths:
+            print(f"Ingesting {path} ...")
+            batch: Dict[int, Dict[str, Any]] = {}
+            for kind, item in iter_baseline(path):
+                if kind == "article":
+                    batch[item["pmid"]] = item
+                    if len(batch) >= batch_size:
+                        self.add_articles(list(batch.values()))
+                        added += len(batch)
+                        batch.clear()
+                else:
+                    if batch:
+                        self.add_articles(list(batch.values()))
+                        added += len(batch)
+                        batch.clear()
+                    self.delete([item])
+                    deleted += 1
+            if batch:
+                self.add_articles(list(batch.values()))
+                added += len(batch)
+        db = self._db()
+        with db:
+            db.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+        return {"added": added, "deleted": deleted, "total": self.count()}
+
+    # ───────── reads ─────────
+    def search(self, query: str, retmax: int = 4) -> List[str]:
+        """PMIDs (as strings, best bm25 first) for a PubMed-syntax query."""
+        fts = to_fts_query(query)
+        if not fts:
+            return []
+        with tracing.span("pubmed_local", op="search", retmax=retmax) as sp:
+            try:
+                rows = self._db().execute(
+                    "SELECT rowid FROM articles_fts WHERE articles_fts MATCH ? "
+                    "ORDER BY bm25(articles_fts, ?, ?, ?) LIMIT ?",
+                    (fts, *BM25_WEIGHTS, retmax),
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                # should not happen after translation – treat like an empty result
+                print(f"[pubmed_index] FTS query failed ({e}): {fts}")
+                rows = []
+            sp.set(hits=len(rows))
+        return [str(pmid) for (pmid,) in rows]
+
+    def abstracts(self, pmids: Sequence[str]) -> Dict[str, str]:
+        """PMID → "title abstract" for PMIDs that have an abstract (same shape as efetch)."""
+        ids = [int(p) for p in dict.fromkeys(pmids) if str(p).isdigit()]
+        out: Dict[str, str] = {}
+        with tracing.span("pubmed_local", op="abstracts", pmids=len(ids)):
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows = self._db().execute(
+                    f"SELECT pmid, title, abstract FROM articles WHERE pmid IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for pmid, title, abstract in rows:
+                    if abstract:
+                        out[str(pmid)] = f"{title} {abstract}".strip()
+        return out
+
+
+_INDEX: Optional[PubMedIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_pubmed_index() -> PubMedIndex:
+    """Shared index at PUBMED_INDEX_PATH; fails if it has not been built yet."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                if not os.path.exists(PUBMED_INDEX_PATH):
+                    raise FileNotFoundError(
+                        f"no local PubMed index at {PUBMED_INDEX_PATH} – run `python -m app.pubmed_index ingest …`"
+                    )
+                _INDEX = PubMedIndex(PUBMED_INDEX_PATH)
+    return _INDEX
+
+
+def use_local() -> bool:
+    return PUBMED_BACKEND == "local"
+
+
+# ───────── CLI ─────────
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--index", default=PUBMED_INDEX_PATH, help="index file (default: %(default)s)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_ingest = sub.add_parser("ingest", help="add PubMed baseline/update XML(.gz) files")
+    p_ingest.add_argument("files", nargs="+")
+    p_search = sub.add_parser("search", help="run a PubMed-syntax query")
+    p_search.add_argument("query")
+    p_search.add_argument("--retmax", type=int, default=10)
+    sub.add_parser("stats", help="number of indexed articles")
+    args = ap.parse_args()
+
+    index = PubMedIndex(args.index)
+    if args.cmd == "ingest":
+        t0 = time.time()
+        result = index.ingest(args.files)
+        print(f"{result} in {time.time() - t0:.1f}s")
+    elif args.cmd == "search":
+        print(f"FTS5: {to_fts_query(args.query)}")
+        t0 = time.perf_counter()
+        pmids = index.search(args.query, args.retmax)
+        print(f"{len(pmids)} hits in {(time.perf_counter() - t0) * 1000:.1f} ms")
+        for pmid, text in index.abstracts(pmids).items():
+            print(f"  {pmid}: {text[:100]}")
+    else:
+        print(f"{index.count()} articles in {args.index}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,124 @@
-import instaloader
-import moviepy.editor as mp
+"""
+REEL AUDIO
+──────────
+• Resolves a reel URL with Instaloader and streams only its audio track
+  through ffmpeg into a 16 kHz mono float32 numpy buffer – the format
+  Whisper expects – without decoding video or writing a WAV.
+• ffmpeg reads the CDN URL directly; only if that fails is the MP4
+  downloaded, into a temp directory of its own that is removed afterwards
+  (concurrent requests never share files).
+"""
+
 import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+SAMPLE_RATE = 16_000          # Whisper's input rate
+FFMPEG_TIMEOUT = 300          # seconds for one decode
+
+
+def shortcode_from_url(video_url: str) -> str:
+    return urlparse(video_url).path.rstrip("/").split("/")[-1]
+
+
+def _loader() -> Any:
+    import instaloader   # only needed once a real reel is fetched
+    # only the video itself: no thumbnails, JSON metadata, captions or comments
+    return instaloader.Instaloader(
+        quiet=True,
+        download_pictures=False,
+        download_video_thumbnails=False,
+        download_geotags=False,
+        download_comments=False,
+        save_metadata=False,
+        compress_json=False,
+        post_metadata_txt_pattern="",
+    )
+
+
+def _post(loader: Any, video_url: str) -> Any:
+    import instaloader
+    return instaloader.Post.from_shortcode(loader.context, shortcode_from_url(video_url))
 
-def download_reel(video_url):
+
+def decode_audio(source: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode the audio track of `source` (file path or http(s) URL) with ffmpeg
+    into a mono float32 array; the video stream is ignored (-vn).
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", source,
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        "-f", "f32le", "-",
+    ]
     try:
-        loader = instaloader.Instaloader()
-        loader.download_post(instaloader.Post.from_shortcode(loader.context, video_url.split('/')[-2]), target='temp')
-        video_file = [f for f in os.listdir('temp') if f.endswith('.mp4')][0]
-        return os.path.join('temp', video_file)
+        proc = subprocess.run(cmd, capture_output=True, check=True, timeout=FFMPEG_TIMEOUT)
+    except FileNotFoundError as e:
+        raise RuntimeError("ffmpeg not found on PATH") from e
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg failed: {e.stderr.decode(errors='replace').strip()}") from e
+    audio = np.frombuffer(proc.stdout, dtype=np.float32)
+    if audio.size == 0:
+        raise RuntimeError("reel has no audio track")
+    return audio
+
+
+def download_reel(video_url: str, target_dir: str) -> Optional[str]:
+    """Download the reel's MP4 into `target_dir`; returns its path (None on failure)."""
+    try:
+        loader = _loader()
+        post = _post(loader, video_url)
+        loader.download_post(post, target=target_dir)
     except Exception as e:
         print(f"Error downloading reel: {e}")
         return None
+    # Instaloader writes into a folder named after `target`
+    for root, _, files in os.walk(target_dir):
+        for name in files:
+            if name.endswith(".mp4"):
+                return os.path.join(root, name)
+    return None
+
 
-# Function to convert video to audio
-def convert_video_to_audio(video_file):
-    clip = mp.VideoFileClip(video_file)
-    clip.audio.write_audiofile("./temp/audio.wav")
-    return "./temp/audio.wav"
+def load_reel_audio(video_url: str) -> np.ndarray:
+    """16 kHz mono float32 audio of a reel (streamed; downloaded only as a fallback)."""
+    try:
+        loader = _loader()
+        post = _post(loader, video_url)
+        if post.video_url:
+            return decode_audio(post.video_url)
+    except Exception as e:
+        print(f"Streaming the reel audio failed ({e}); downloading the MP4 instead")
+
+    tmp_dir = tempfile.mkdtemp(prefix="reel_")
+    try:
+        video_file = download_reel(video_url, os.path.join(tmp_dir, "post"))
+        if video_file is None:
+            raise RuntimeError(f"could not download reel {video_url}")
+        return decode_audio(video_file)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
-def convert_video_to_wav(video_url):
-    video_file_path = download_reel(video_url)
-    if video_file_path:
-        audio_file_path = convert_video_to_audio(video_file_path)
-        return audio_file_path
-    else:
-        print("Failed to download reel")
+def convert_video_to_wav(video_url: str, wav_path: Optional[str] = None) -> str:
+    """
+    Write the reel's audio as a 16 kHz mono WAV (for tools that need a file).
+    Without `wav_path` it goes to a fresh temp directory the caller removes.
+    """
+    if wav_path is None:
+        wav_path = os.path.join(tempfile.mkdtemp(prefix="reel_"), "audio.wav")
+    audio = load_reel_audio(video_url)
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(wav_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+    return wav_path
@@ -0,0 +1,119 @@
+"""
+PIPELINE RESULT CACHE
+─────────────────────
+• Finished run_pipeline results keyed by reel ID, kept in a small
+  in-memory LRU and in the on-disk SqliteCache (both with a TTL).
+• Concurrent requests for the same key share one in-flight computation
+  instead of each starting their own pipeline.
+• Results with failed step 7 verdicts (LLM outage) are not cached, so the
+  next request for that reel runs again instead of getting the bad result.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .cache_store import SqliteCache
+from .step_7_statement_to_truthness import fallback_statements
+
+RESULT_TTL = 6 * 3600
+RESULT_MEMORY_MAX_ENTRIES = 256
+RESULT_DISK_MAX_ENTRIES = 5_000
+
+
+class ResultCache:
+    def __init__(
+        self,
+        ttl: float = RESULT_TTL,
+        memory_max_entries: int = RESULT_MEMORY_MAX_ENTRIES,
+        disk_max_entries: int = RESULT_DISK_MAX_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.memory_max_entries = memory_max_entries
+        self.disk = SqliteCache("pipeline_results", ttl=ttl, max_entries=disk_max_entries)
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    # ───────── plain cache ─────────
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                stored_at, value = hit
+                if now - stored_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+        entry = self.disk.get(key)
+        # disk entries are {"created_at", "value"}; the memory copy keeps the
+        # original time so it cannot outlive the TTL
+        if not isinstance(entry, dict) or "created_at" not in entry or now - entry["created_at"] > self.ttl:
+            return None
+        self._remember(key, entry["value"], entry["created_at"])
+        return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        """Cache `value`, unless it carries failed or fallback verdicts (then any old entry is dropped too)."""
+        if isinstance(value, dict) and fallback_statements(value):
+            self.delete(key)
+            return
+        now = time.time()
+        self._remember(key, value, now)
+        self.disk.set(key, {"created_at": now, "value": value})
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        self.disk.delete(key)
+
+    def _remember(self, key: str, value: Any, stored_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (stored_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_max_entries:
+                self._memory.popitem(last=False)
+
+    # ───────── coalescing ─────────
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for `key`; otherwise run `compute()` once,
+        letting concurrent callers with the same key wait for that run.
+        Failures are passed to every waiter and are not cached.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            print(f"Joining in-flight pipeline for {key}")
+            return future.result()
+
+        try:
+            # another owner may have finished between the first lookup and now
+            result = self.get(key)
+            if result is None:
+                result = compute()
+                self.set(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
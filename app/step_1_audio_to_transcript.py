@@ -1,13 +1,26 @@
 #!/usr/bin/env python3
-from typing import Any, Dict, Union
-import argparse, datetime as dt, json, re, sys
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Union
+import argparse, datetime as dt, hashlib, importlib.util, json, os, re, sys, threading
 from pathlib import Path
 
-import whisper   # pip install -U openai-whisper
+import numpy as np
+
+from .cache_store import SqliteCache
+from . import tracing
 
 WHISPER_MODEL_NAME = "turbo"     #tiny, base, small, medium, large
+WHISPER_SINGLE_PASS = True       # detect language on the first 30 s, then decode once
+ASR_BACKEND = os.environ.get("FACT_CHECKER_ASR_BACKEND", "auto")   # whisper | faster-whisper | auto
+ASR_CPU_THREADS = int(os.environ.get("FACT_CHECKER_ASR_CPU_THREADS", "0"))   # 0 = all cores (faster-whisper)
+ASR_BEAM_SIZE = int(os.environ["FACT_CHECKER_ASR_BEAM_SIZE"]) if os.environ.get("FACT_CHECKER_ASR_BEAM_SIZE") else None   # None = engine default (whisper: greedy)
+ASR_COMPUTE_TYPE = os.environ.get("FACT_CHECKER_ASR_COMPUTE_TYPE", "")   # "" = int8 on CPU, float16 on CUDA
+TRANSCRIPT_CACHE_MAX_ENTRIES = 10_000
+AudioInput = Union[str, Path, np.ndarray]   # file path, or 16 kHz mono float32 samples
 TRAILING_COMMAS_RE = re.compile(r",\s*(?=[\]}])")  # tolerate trailing commas
 
+TRANSCRIPT_CACHE = SqliteCache("whisper_transcripts", max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES)
+
 # ───────── helpers ─────────
 def load_json_relaxed(path: Union[str, Path]) -> Dict[str, Any]:
     raw = Path(path).read_text(encoding="utf-8")
@@ -16,25 +29,236 @@ def load_json_relaxed(path: Union[str, Path]) -> Dict[str, Any]:
 def write_json(path: Union[str, Path], data: Dict[str, Any]) -> None:
     Path(path).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
 
-def transcribe_audio(audio_path: Union[str, Path]) -> str:
-    model = whisper.load_model(WHISPER_MODEL_NAME)
-    res   = model.transcribe(str(audio_path), fp16=True)
-    text  = res["text"].strip()
-    if res.get("language", "en") != "en":
-        res  = model.transcribe(str(audio_path), task="translate", fp16=True)
-        text = res["text"].strip()
-    return text
+# ───────── ASR backends ─────────
+def _whisper() -> Any:
+    """openai-whisper (pulls in torch) – imported on first use, not at app import."""
+    import whisper   # pip install -U openai-whisper
+    return whisper
+
+class AsrBackend(ABC):
+    """One speech-recognition engine: load once, then audio → English text + source language."""
+    name = "base"
+
+    def __init__(self, model_name: str = WHISPER_MODEL_NAME):
+        self.model_name = model_name
+        self._model: Any = None
+        self._load_lock = threading.Lock()
+        self._decode_lock = threading.Lock()   # one decode at a time per loaded model
+
+    @property
+    def model(self) -> Any:
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    print(f"Loading {self.name} model '{self.model_name}' ...")
+                    self._model = self._load()
+        return self._model
+
+    @abstractmethod
+    def _load(self) -> Any:
+        """Load and return the engine's model."""
+
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray) -> Dict[str, str]:
+        """16 kHz mono samples → {"text": English transcript, "language": source language}."""
+
+    @property
+    @abstractmethod
+    def compute_type(self) -> str:
+        """Numeric precision of the decode (part of the transcript cache key)."""
+
+    @property
+    def cache_tag(self) -> str:
+        return f"{self.name}:{self.model_name}:{self.compute_type}"
+
+    def decode_options(self) -> Dict[str, Any]:
+        """Only what is configured, so each engine keeps its own defaults otherwise."""
+        return {"beam_size": ASR_BEAM_SIZE} if ASR_BEAM_SIZE else {}
+
+
+class WhisperBackend(AsrBackend):
+    """openai-whisper on PyTorch; fp16 only on CUDA (CPU decodes in fp32)."""
+    name = "whisper"
+
+    def _load(self) -> Any:
+        return _whisper().load_model(self.model_name)
+
+    @property
+    def compute_type(self) -> str:
+        if self._model is not None:
+            return "float16" if self._model.device.type == "cuda" else "float32"
+        try:
+            import torch   # already a whisper dependency; only asked before the model is loaded
+            return "float16" if torch.cuda.is_available() else "float32"
+        except ImportError:
+            return "float32"
+
+    def detect_language(self, audio: np.ndarray) -> str:
+        """Most likely language code of the first 30 s window."""
+        whisper = _whisper()
+        segment = whisper.pad_or_trim(audio)
+        mel = whisper.log_mel_spectrogram(segment, n_mels=self.model.dims.n_mels).to(self.model.device)
+        _, probs = self.model.detect_language(mel)
+        return max(probs, key=probs.get)
+
+    def transcribe(self, audio: np.ndarray) -> Dict[str, str]:
+        model = self.model
+        fp16 = model.device.type == "cuda"
+        opts = self.decode_options()
+        with self._decode_lock:
+            if WHISPER_SINGLE_PASS:
+                lang  = self.detect_language(audio)
+                task  = "transcribe" if lang == "en" else "translate"
+                res   = model.transcribe(audio, task=task, language=lang, fp16=fp16, **opts)
+                return {"text": res["text"].strip(), "language": lang}
+
+            res   = model.transcribe(audio, fp16=fp16, **opts)
+            text  = res["text"].strip()
+            lang  = res.get("language", "en")
+            if lang != "en":
+                res  = model.transcribe(audio, task="translate", fp16=fp16, **opts)
+                text = res["text"].strip()
+        return {"text": text, "language": lang}
+
+
+class FasterWhisperBackend(AsrBackend):
+    """
+    faster-whisper (CTranslate2): int8 weights on CPU, float16 on CUDA.
+    Same Whisper checkpoints, several times faster than PyTorch fp32 on CPU.
+    """
+    name = "faster-whisper"
+
+    def _load(self) -> Any:
+        from faster_whisper import WhisperModel   # pip install faster-whisper
+        device = "cuda" if _cuda_devices() else "cpu"
+        return WhisperModel(self.model_name, device=device, compute_type=self.compute_type, cpu_threads=ASR_CPU_THREADS)
+
+    @property
+    def compute_type(self) -> str:
+        return ASR_COMPUTE_TYPE or ("float16" if _cuda_devices() else "int8")
+
+    def transcribe(self, audio: np.ndarray) -> Dict[str, str]:
+        model = self.model
+        opts = self.decode_options()
+        with self._decode_lock:
+            # language detection runs up front; segments decode lazily while iterating
+            segments, info = model.transcribe(audio, **opts)
+            lang = info.language
+            if lang != "en":
+                segments, _ = model.transcribe(audio, task="translate", language=lang, **opts)
+            text = "".join(seg.text for seg in segments).strip()
+        return {"text": text, "language": lang}
+
+
+ASR_BACKENDS = {b.name: b for b in (WhisperBackend, FasterWhisperBackend)}
+
+def _cuda_devices() -> int:
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count()
+    except Exception:
+        return 0
+
+def resolve_backend(name: str = ASR_BACKEND) -> str:
+    """"auto" → faster-whisper on hosts without CUDA when it is installed, else whisper."""
+    if name != "auto":
+        if name not in ASR_BACKENDS:
+            raise ValueError(f"unknown ASR backend {name!r} (choose from {', '.join(ASR_BACKENDS)} or auto)")
+        return name
+    if importlib.util.find_spec("faster_whisper") is not None and not _cuda_devices():
+        return "faster-whisper"
+    return "whisper"
+
+_BACKENDS: Dict[str, AsrBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+def get_asr_backend(name: str = ASR_BACKEND) -> AsrBackend:
+    """The configured backend, created once per process and reused afterwards."""
+    name = resolve_backend(name)
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(name)
+        if backend is None:
+            backend = _BACKENDS[name] = ASR_BACKENDS[name]()
+    return backend
+
+def warmup_whisper() -> None:
+    """Load the configured backend's model up front (called at API startup)."""
+    get_asr_backend().model
+
+def load_audio(audio: AudioInput) -> np.ndarray:
+    """Samples as float32; files are decoded with ffmpeg (16 kHz mono)."""
+    if isinstance(audio, np.ndarray):
+        return audio.astype(np.float32, copy=False)
+    from .reel_utils import decode_audio
+    return decode_audio(str(audio))
+
+def transcribe(audio_path: AudioInput) -> Dict[str, str]:
+    """Transcript (English) plus the detected source language."""
+    backend = get_asr_backend()
+    with tracing.span("asr", backend=backend.name, model=backend.model_name):
+        return backend.transcribe(load_audio(audio_path))
+
+def transcribe_audio(audio_path: AudioInput) -> str:
+    return transcribe(audio_path)["text"]
+
+def audio_sha256(audio_path: AudioInput) -> str:
+    """Content hash of the audio file, or of the raw samples for in-memory audio."""
+    h = hashlib.sha256()
+    if isinstance(audio_path, np.ndarray):
+        h.update(np.ascontiguousarray(audio_path, dtype=np.float32).tobytes())
+        return h.hexdigest()
+    with open(audio_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def transcript_key(kind: str, value: str) -> str:
+    """TRANSCRIPT_CACHE key: backend, model and compute type, so switching engines never serves the other's text."""
+    return f"{get_asr_backend().cache_tag}|{kind}:{value}"
+
+def has_cached_transcript(reel_id: str) -> bool:
+    """True if the reel's transcript is cached, so its audio need not be downloaded."""
+    return TRANSCRIPT_CACHE.get(transcript_key("reel", reel_id)) is not None
+
+def cached_transcribe(audio_path: Optional[AudioInput], reel_id: Optional[str] = None) -> Dict[str, str]:
+    """
+    Look the audio up in TRANSCRIPT_CACHE (by reel shortcode, then by content
+    hash) before running the ASR backend; store new transcripts under both keys.
+    `audio_path` may be None when the reel's transcript is cached.
+    """
+    keys = []
+    if reel_id:
+        keys.append(transcript_key("reel", reel_id))
+        hit = TRANSCRIPT_CACHE.get(keys[0])
+        if hit is not None:
+            print(f"Transcript cache hit (reel:{reel_id})")
+            return hit
+    if audio_path is None:
+        raise ValueError("no audio given and no cached transcript for this reel")
+    # only hash the audio when the shortcode is unknown
+    keys.append(transcript_key("sha256", audio_sha256(audio_path)))
+    hit = TRANSCRIPT_CACHE.get(keys[-1])
+    if hit is not None:
+        print("Transcript cache hit (audio hash)")
+        if reel_id:
+            TRANSCRIPT_CACHE.set(keys[0], hit)
+        return hit
+
+    entry = transcribe(audio_path)
+    backend = get_asr_backend()
+    entry.update(model=backend.model_name, backend=backend.name, compute_type=backend.compute_type)
+    TRANSCRIPT_CACHE.set_many({key: entry for key in keys})
+    return entry
 
 # ───────── core ─────────
-def update_transcript(json_in: str, audio_in: str) ->  Dict[str, Any]:
+def update_transcript(json_in: str, audio_in: Optional[AudioInput], reel_id: Optional[str] = None) ->  Dict[str, Any]:
     print("Starting transcribing: estimated time: 10 - 20 seconds")
     print("...")
     print("...")
 
     data             = load_json_relaxed(json_in)
-    data["transcript"] = transcribe_audio(audio_in)
+    data["transcript"] = cached_transcribe(audio_in, reel_id)["text"]
     data["generated_at"] = dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
-    print(" --- Step1 Audio to Transcript ---> LLM Output: ---")
-    print(data["transcript"])
+    tracing.event("step1.transcript", level="debug", transcript=data["transcript"])
     return data
@@ -17,13 +17,21 @@ import re
 import sys
 from typing import Any, Dict, List
 
-import openai
-
 from .preprompts import *
 from .llmconfigs import *
+from .llm_parsing import load_json_reply, structured_completion
 
 
 TRAILING_COMMAS_RE = re.compile(r",\s*(?=[\]}])")
+MAX_STATEMENTS = 3            # PROMPT_TMPL_S2 asks for at most three claims
+
+CLAIMS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "claims": {"type": "array", "items": {"type": "string"}, "minItems": 1, "maxItems": MAX_STATEMENTS},
+    },
+    "required": ["claims"],
+}
 
 # ────────────────────────────────────────────────────────────────────
 # Helper functions
@@ -38,6 +46,19 @@ def clean_json_content(content: str) -> str:
     return re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip(), flags=re.IGNORECASE)
 
 
+def parse_claims(reply: str) -> List[str]:
+    """{"claims": [...]} (or a bare JSON array) → non-empty claim strings."""
+    value = load_json_reply(reply)
+    if isinstance(value, dict):
+        value = value.get("claims")
+    if not isinstance(value, list) or not all(isinstance(c, str) for c in value):
+        raise ValueError("expected a JSON array of strings under 'claims'")
+    claims = [c.strip() for c in value if c.strip()]
+    if not claims:
+        raise ValueError("no claims returned")
+    return claims[:MAX_STATEMENTS]
+
+
 def split_into_medical_statements(transcript: str) -> List[str]:
     """LLM → JSON array of medically-relevant claims."""
     print("Starting Step2: Transcript to Medical Statements")
@@ -46,23 +67,24 @@ def split_into_medical_statements(transcript: str) -> List[str]:
     
     prompt = PROMPT_TMPL_S2.format(transcript=transcript.strip())
     try:
-        resp = CLIENT_2.chat.completions.create(
-            model=MODEL_2,
+        claims = structured_completion(
+            "step2", CLIENT_2, MODEL_2, prompt,
+            parse=parse_claims,
+            schema=CLAIMS_SCHEMA,
             temperature=TEMP_2,
-            max_tokens=MAX_TOKENS_2, 
-            messages=[{"role": "user", "content": prompt}],
+            max_tokens=MAX_TOKENS_2,
+            use_cache=CACHE_2,
         )
-        content = resp.choices[0].message.content.strip()
-        cleaned = clean_json_content(content)
         print(" --- Step2 Transcript to Statements ---> LLM Output: ---")
-        print(cleaned)
-        return json.loads(cleaned)
+        print(claims)
+        return claims
     except Exception as e:
         print(e)
         print("FALLBACK")
-        # Fallback: naïve sentence split; real pipeline should re-prompt or log
+        # Fallback: naïve sentence split, capped so a bad reply can't fan out
+        # into dozens of statements in every later step
         rough = re.split(r"[.!?]\s+", transcript)
-        return [s.strip() for s in rough if s.strip()]
+        return [s.strip() for s in rough if s.strip()][:MAX_STATEMENTS]
 
 
 def statement_skeleton(text: str, idx: int) -> Dict[str, Any]:
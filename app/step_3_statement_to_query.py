@@ -13,11 +13,13 @@ import datetime as dt
 import json
 import re
 import sys
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-import openai
+if TYPE_CHECKING:      # imported lazily where a client is actually built
+    import openai
 from .preprompts import *
 from .llmconfigs import *
+from .llm_parsing import load_json_reply, structured_completion
 # ───────── config ─────────
 
 TRAILING_COMMAS_RE = re.compile(r",\s*(?=[\]}])")
@@ -27,6 +29,12 @@ TRAILING_COMMAS_RE = re.compile(r",\s*(?=[\]}])")
 # first visible line that starts with a letter
 QUERY_LINE_RE = re.compile(r"^(?!\s*$).+", re.MULTILINE)
 
+QUERY_SCHEMA = {
+    "type": "object",
+    "properties": {"query": {"type": "string"}},
+    "required": ["query"],
+}
+
 # ───────── helpers ─────────
 def load_json(path: str) -> Dict[str, Any]:
     raw = open(path, "r", encoding="utf-8").read()
@@ -79,26 +87,36 @@ def clean_query(raw: str, fallback_source: str) -> str:
     return " ".join(deduped[:8])
 
 
-def make_query(claim: str, client: openai.OpenAI) -> str:
+def parse_query(reply: str) -> str:
+    """{"query": "..."} → one-line query; "" when the model answered NONE."""
+    value = load_json_reply(reply)
+    query = value.get("query") if isinstance(value, dict) else None
+    if not isinstance(query, str) or not query.strip():
+        raise ValueError("expected a non-empty string under 'query'")
+    query = " ".join(query.split())
+    return "" if query.upper() == "NONE" else query
+
+
+def make_query(claim: str, client: "openai.OpenAI") -> str:
     prompt = PROMPT_TMPL_S3.format(claim=claim)
     try:
-        resp = CLIENT_3.chat.completions.create(
-            model=MODEL_3,
+        query = structured_completion(
+            "step3", CLIENT_3, MODEL_3, prompt,
+            parse=parse_query,
+            schema=QUERY_SCHEMA,
             temperature=TEMP_3,
             max_tokens=MAX_TOKENS_3,
-            stop=["\n"],                         # cut at first newline
-            messages=[{"role": "user", "content": prompt}],
+            use_cache=CACHE_3,
         )
-        raw = resp.choices[0].message.content
         print(" --- Step3 Statement to Query ---> LLM Output: ---")
-        print(raw)
-        
-        return clean_query(raw, claim)
+        print(query)
+        return query
     except Exception as e:
         
         print("ERROR ERROR ERROR --> FALLBACK \n")
         print(e)
-        return " "
+        # keyword query built from the claim itself
+        return clean_query("", claim)
 
 # ───────── core ─────────
 def update_query(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,9 +1,30 @@
 
 import requests
 import re
+import sqlite3
 from typing import Any, Dict, List
 from .preprompts import *
 from .llmconfigs import *
+from .pubmed_cache import ESEARCH_CACHE, esearch_key
+from .ncbi_client import get_ncbi_client
+from . import pubmed_index
+
+# NCBI errors, a missing / broken local index, malformed esearch JSON
+LOOKUP_ERRORS = (requests.RequestException, OSError, sqlite3.Error, KeyError, ValueError)
+
+def get_urls(query: str, retmax: int = 4) -> List[str]:
+    """Return up to `retmax` PubMed article URLs matching `query`."""
+    if pubmed_index.use_local():
+        # local FTS index: milliseconds, no point caching
+        ids = pubmed_index.get_pubmed_index().search(query, retmax=retmax)
+        return [f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" for pmid in ids]
+    key = esearch_key(query, retmax)
+    ids = ESEARCH_CACHE.get(key)
+    if ids is None:
+        ids = get_ncbi_client().esearch(query, retmax=retmax)
+        ESEARCH_CACHE.set(key, ids)
+    return [f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" for pmid in ids]
+
 
 def query_to_link(data: Dict[str, Any],) -> Dict[str, Any]:
     """
@@ -17,20 +38,6 @@ def query_to_link(data: Dict[str, Any],) -> Dict[str, Any]:
     print("...")
     
 
-    def get_urls(query: str, retmax: int = 4) -> List[str]:
-        """Return up to `retmax` PubMed article URLs matching `query`."""
-        search_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-        params = {
-            "db": "pubmed",
-            "term": query,
-            "retmax": retmax,
-            "retmode": "json"
-        }
-        resp = requests.get(search_url, params=params)
-        resp.raise_for_status()
-        ids = resp.json()["esearchresult"]["idlist"]
-        return [f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" for pmid in ids]
-
     # 2) For each statement, call get_urls and append to evidence
     for stmt in data.get("statements", []):
         query = stmt.get("query")
@@ -39,7 +46,7 @@ def query_to_link(data: Dict[str, Any],) -> Dict[str, Any]:
 
         try:
             urls = get_urls(query)
-        except requests.RequestException as e:
+        except LOOKUP_ERRORS as e:
             print(f"[WARN] PubMed lookup failed for '{query}': {e}")
             continue
 
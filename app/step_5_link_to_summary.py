@@ -6,16 +6,26 @@ import sys
 import re
 from typing import Optional, List, Dict, Any
 import datetime
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 
 from .preprompts import *
 from .llmconfigs import *
-
-# Base URL for NCBI E-utilities
-NCBI_EUTILS = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+from .pubmed_cache import EFETCH_CACHE, EFETCH_EMPTY_CACHE
+from .ncbi_client import get_ncbi_client
+from . import pubmed_index
+from .embeddings import cosine_similarities, top_k_indices
+from . import tracing
+
+# Max PMIDs per efetch request
+EFETCH_CHUNK_SIZE = 200
 # Regex to find PMID in PubMed URL
 PUBMED_URL_RE = re.compile(r"pubmed\.ncbi\.nlm\.nih\.gov/(\d+)/?")
 # Regex to remove trailing commas before } or ] in relaxed JSON
 TRAILING_COMMAS_RE = re.compile(r",\s*(?=[\]}])")
+# One summary pool for the whole process: in lanes mode every statement's
+# link_to_summary shares it, so at most MAX_WORKERS_5 step-5 calls run at once
+SUMMARY_POOL = ThreadPoolExecutor(max_workers=max(1, MAX_WORKERS_5), thread_name_prefix="step5")
 
 
 def extract_pmid(url: str) -> str:
@@ -28,31 +38,72 @@ def extract_pmid(url: str) -> str:
     raise ValueError(f"Unable to extract PMID from URL: {url}")
 
 
+def _article_text(article: ET.Element) -> Optional[str]:
+    """Title + (labelled) abstract sections of one <PubmedArticle>."""
+    parts: List[str] = []
+    title = article.find(".//ArticleTitle")
+    if title is not None:
+        parts.append("".join(title.itertext()).strip())
+    for sec in article.findall(".//Abstract/AbstractText"):
+        text = "".join(sec.itertext()).strip()
+        if not text:
+            continue
+        label = sec.get("Label")
+        parts.append(f"{label}: {text}" if label else text)
+    # a bare title is not worth summarising
+    if len(parts) < 2:
+        return None
+    return " ".join(p for p in parts if p)
+
+
+def pubmed_fetch_abstracts(pmids: List[str], chunk_size: int = EFETCH_CHUNK_SIZE) -> Dict[str, str]:
+    """
+    Fetch abstracts for many PMIDs with one efetch call per `chunk_size` ids
+    (comma-separated `id=`, XML). PMIDs already in the on-disk cache are not
+    requested again, nor are those recently fetched without an abstract
+    (EFETCH_EMPTY_CACHE). Returns PMID → abstract; PMIDs without an abstract
+    are left out. With PUBMED_BACKEND="local" they come from the local index.
+    """
+    unique = list(dict.fromkeys(p for p in pmids if p))
+    if pubmed_index.use_local():
+        return pubmed_index.get_pubmed_index().abstracts(unique)
+    abstracts: Dict[str, str] = EFETCH_CACHE.get_many(unique)
+    missing = [p for p in unique if p not in abstracts]
+    without = EFETCH_EMPTY_CACHE.get_many(missing)
+    missing = [p for p in missing if p not in without]
+    for i in range(0, len(missing), chunk_size):
+        chunk = missing[i:i + chunk_size]
+        root = ET.fromstring(get_ncbi_client().efetch_xml(chunk))
+        fetched: Dict[str, str] = {}
+        for article in root.iter("PubmedArticle"):
+            pmid_el = article.find("./MedlineCitation/PMID")
+            if pmid_el is None or not pmid_el.text:
+                continue
+            text = _article_text(article)
+            if text:
+                fetched[pmid_el.text.strip()] = text
+        EFETCH_CACHE.set_many(fetched)
+        EFETCH_EMPTY_CACHE.set_many({p: True for p in chunk if p not in fetched})
+        abstracts.update(fetched)
+    return abstracts
+
+
 def pubmed_fetch_abstract(pmid: str) -> Optional[str]:
     """Fetch abstract text for given PMID (returns None if none found)."""
-    params = {"db": "pubmed", "id": pmid, "rettype": "abstract", "retmode": "text"}
-    r = requests.get(f"{NCBI_EUTILS}/efetch.fcgi", params=params, timeout=20)
-    r.raise_for_status()
-    lines = [line.strip() for line in r.text.splitlines() if line.strip()]
-    abstract = " ".join(line for line in lines if not line.isupper())
-    return abstract or None
+    return pubmed_fetch_abstracts([pmid]).get(pmid)
 
 
 def summarize_with_gemma(text: str) -> str:
     "Use Ollama+Gemma3 to generate a summary."
-    print("Print abstract to summarize:")
-    print(text)
     try:
         prompt = PROMPT_TMPL_S5.format(abstract=text)
-        res = CLIENT_5.chat.completions.create(
-            model=MODEL_5,
-            messages=[{"role": "user", "content": prompt}],
+        reply: str = chat_completion(
+            CLIENT_5, MODEL_5, prompt,
             temperature=TEMP_5,
             max_tokens=MAX_TOKENS_5,
-        )
-        reply: str = res.choices[0].message.content.strip()
-        print(" --- Step5 Link to Summary ---> LLM output --- ")
-        print(f"LLM output (Summary of Abstract): {reply} ")
+            use_cache=CACHE_5,
+        ).strip()
+        tracing.event("step5.summary", level="debug", abstract=text, summary=reply)
         return reply
 
     except Exception as exc:
@@ -63,6 +114,41 @@ def summarize_with_gemma(text: str) -> str:
 
 
 
+def prefilter_evidence(stmt: Dict[str, Any], abstracts: Dict[str, str]) -> None:
+    """
+    Keep the EMBED_TOP_K evidence items whose abstract is most similar to the
+    statement (cosine ≥ EMBED_MIN_SIMILARITY); the score goes to ev['relevance'].
+    Items without an abstract are left alone; on embedding errors nothing is dropped.
+    """
+    evidence = stmt.get('evidence', [])
+    scored = []
+    for i, ev in enumerate(evidence):
+        try:
+            pmid = extract_pmid(ev.get('url'))
+        except Exception:
+            continue
+        if pmid in abstracts:
+            scored.append((i, abstracts[pmid]))
+    if not scored:
+        return
+
+    try:
+        scores = cosine_similarities(stmt.get('text', ''), [text for _, text in scored])
+    except Exception as e:
+        print(f"Warning: embedding pre-filter failed, keeping all evidence: {e}", file=sys.stderr)
+        return
+
+    keep = {scored[j][0] for j in top_k_indices(scores, EMBED_MIN_SIMILARITY, EMBED_TOP_K)}
+    dropped = set()
+    for (i, _), score in zip(scored, scores):
+        evidence[i]['relevance'] = round(float(score), 3)
+        if i not in keep:
+            dropped.add(i)
+    if dropped:
+        print(f"Embedding pre-filter dropped {len(dropped)}/{len(evidence)} evidence items for statement {stmt.get('id')}")
+    stmt['evidence'] = [ev for i, ev in enumerate(evidence) if i not in dropped]
+
+
 def load_json_relaxed(path: str) -> Any:
     """Load JSON file, removing trailing commas to tolerate common mistakes."""
     raw = open(path, 'r', encoding='utf-8').read()
@@ -75,28 +161,53 @@ def link_to_summary(data: Dict[str, Any]) -> Dict[str, Any]:
     print("...")
     print("...")
 
-    # Helper to process a list of evidence items
-    def process_evidence_list(ev_list: List[Dict[str, Any]]):
-        for ev in ev_list:
-            url = ev.get('url')
-            try:
-                pmid = extract_pmid(url)
-                ev['pubmed_id'] = pmid
-                abstract = pubmed_fetch_abstract(pmid)
-                ev['summary'] = summarize_with_gemma(abstract) if abstract else None
-                print(f"Processed evidence URL {url} with PMID {pmid}")
-            except Exception as e:
-                print(f"Warning: could not process evidence URL {url}: {e}", file=sys.stderr)
-                ev.setdefault('pubmed_id', None)
-                ev.setdefault('summary', None)
-
-    # Process nested evidence under statements
+    # Collect nested evidence under statements plus the top-level list (if present)
+    ev_items: List[Dict[str, Any]] = []
     for stmt in data.get('statements', []):
-        process_evidence_list(stmt.get('evidence', []))
-
-    # Process top-level evidence list if present
+        ev_items.extend(stmt.get('evidence', []))
     if 'evidence' in data:
-        process_evidence_list(data['evidence'])
+        ev_items.extend(data['evidence'])
+
+    # One bulk efetch for every PMID of the reel instead of one request per link
+    pmids: List[str] = []
+    for ev in ev_items:
+        try:
+            pmids.append(extract_pmid(ev.get('url')))
+        except Exception:
+            pass
+    abstracts: Optional[Dict[str, str]] = None
+    if pmids:
+        try:
+            abstracts = pubmed_fetch_abstracts(pmids)
+        except Exception as e:
+            print(f"Warning: bulk efetch failed, fetching PMIDs one by one: {e}", file=sys.stderr)
+
+    # Drop evidence whose abstract is far from the claim before it costs an
+    # LLM summary here and a relevance judgement in step 6
+    if EMBED_FILTER and abstracts:
+        for stmt in data.get('statements', []):
+            prefilter_evidence(stmt, abstracts)
+        ev_items = [ev for stmt in data.get('statements', []) for ev in stmt.get('evidence', [])]
+        ev_items.extend(data.get('evidence', []))
+
+    # Helper to process a single evidence item (mutates it in place)
+    def process_evidence(ev: Dict[str, Any]) -> None:
+        url = ev.get('url')
+        try:
+            pmid = extract_pmid(url)
+            ev['pubmed_id'] = pmid
+            abstract = abstracts.get(pmid) if abstracts is not None else pubmed_fetch_abstract(pmid)
+            ev['summary'] = summarize_with_gemma(abstract) if abstract else None
+            print(f"Processed evidence URL {url} with PMID {pmid}")
+        except Exception as e:
+            print(f"Warning: could not process evidence URL {url}: {e}", file=sys.stderr)
+            ev.setdefault('pubmed_id', None)
+            ev.setdefault('summary', None)
+
+    # Summarise up to MAX_WORKERS_5 abstracts at once (across all concurrent
+    # callers); items are updated in place, so statement/evidence order is unchanged.
+    if ev_items:
+        list(SUMMARY_POOL.map(tracing.propagate(process_evidence), ev_items))
 
     # Update generated timestamp
     data['generated_at'] = datetime.datetime.utcnow().replace(microsecond=0).isoformat() + 'Z'
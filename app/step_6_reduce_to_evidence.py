@@ -1,25 +1,25 @@
+import json
+import re
 import subprocess
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from .preprompts import *
 from .llmconfigs import *
+from . import tracing
 
 def is_related(statement_text: str, evidence_summary: str) -> bool:
     """Use Ollama+Gemma3 to judge whether evidence summary is relevant to the statement text."""
 
     try:
         prompt = PROMPT_TMPL_S6.format(statement=statement_text, evidence_summary=evidence_summary)
-        res = CLIENT_6.chat.completions.create(
-            model=MODEL_6,
-            messages=[{"role": "user", "content": prompt}],
+        reply: str = chat_completion(
+            CLIENT_6, MODEL_6, prompt,
             temperature=TEMP_6,
             max_tokens=MAX_TOKENS_6,
-        )
-        reply: str = res.choices[0].message.content.strip()
-        print(" --- Step6 Reduce Evidence ---> Response ---")
-        print(f" Statement Text: {statement_text} ")
-        print(f" Evidence Summary: {evidence_summary} ")
-        print(f" Response: {reply} ")
+            use_cache=CACHE_6,
+        ).strip()
+        tracing.event("step6.relevance", level="debug",
+                      statement=statement_text, summary=evidence_summary, reply=reply)
         return reply.startswith("yes")
     except Exception as exc:
         print(f"Error during Ollama call Step6: {exc}")
@@ -34,6 +34,52 @@ def is_related(statement_text: str, evidence_summary: str) -> bool:
     
     #return True
 
+def parse_labels(reply: str, count: int) -> Optional[List[bool]]:
+    """JSON array of `count` yes/no labels → booleans (None if malformed)."""
+    cleaned = re.sub(r"^```(?:json)?\s*|\s*```$", "", reply.strip(), flags=re.IGNORECASE)
+    try:
+        labels = json.loads(cleaned)
+    except ValueError:
+        return None
+    if not isinstance(labels, list) or len(labels) != count:
+        return None
+    out: List[bool] = []
+    for label in labels:
+        if isinstance(label, bool):
+            out.append(label)
+        elif isinstance(label, str) and label.strip().lower() in {"yes", "no"}:
+            out.append(label.strip().lower() == "yes")
+        else:
+            return None
+    return out
+
+
+def are_related(statement_text: str, evidence_summaries: List[str]) -> Optional[List[bool]]:
+    """One LLM call for all summaries of a statement; None if the reply can't be parsed."""
+    evidence_list = "\n\n".join(
+        f"[{i}] {summary.replace(chr(10), ' ')}" for i, summary in enumerate(evidence_summaries, 1)
+    )
+    try:
+        prompt = PROMPT_TMPL_S6_BATCH.format(
+            statement=statement_text, evidence_list=evidence_list, count=len(evidence_summaries)
+        )
+        reply: str = chat_completion(
+            CLIENT_6, MODEL_6, prompt,
+            temperature=TEMP_6,
+            max_tokens=MAX_TOKENS_6,
+            use_cache=CACHE_6,
+        ).strip()
+    except Exception as exc:
+        print(f"Error during batched Ollama call Step6: {exc}")
+        return None
+
+    tracing.event("step6.relevance_batch", level="debug", statement=statement_text, reply=reply)
+    labels = parse_labels(reply, len(evidence_summaries))
+    if labels is None:
+        print("Unparsable batched relevance output --> FALLBACK to per-summary calls")
+    return labels
+
+
 def reduce_to_evidence(data: Dict[str, Any]) -> Dict[str, Any]:
     print("Starting Step6: Reduce to Evidence")
     print("...")
@@ -41,17 +87,26 @@ def reduce_to_evidence(data: Dict[str, Any]) -> Dict[str, Any]:
     
     # Iterate through statements
     for stmt in data.get("statements", []):
-        filtered = []
         statement_text = stmt.get("text", "")
+        evidences = stmt.get("evidence", [])
+        summaries = [(ev.get("summary") or "").strip() for ev in evidences]
+        judged = [s for s in summaries if s]
+
+        labels: Optional[List[bool]] = None
+        if BATCH_6 and len(judged) > 1:
+            labels = are_related(statement_text, judged)
+        if labels is None:
+            labels = [is_related(statement_text, s) for s in judged]
+        verdicts = iter(labels)
 
-        for ev in stmt.get("evidence", []):
-            summary_text = ev.get("summary", "").strip()
+        filtered = []
+        for ev, summary_text in zip(evidences, summaries):
             # If there's a summary, only keep if related; if summary is empty, retain for manual review
             if summary_text:
-                if is_related(statement_text, summary_text):
+                if next(verdicts):
                     filtered.append(ev)
             else:
                 filtered.append(ev)
         stmt["evidence"] = filtered
 
-    return data
\ No newline at end of file
+    return data
@@ -1,15 +1,74 @@
 from __future__ import annotations
 import json, re, time
 from pathlib import Path
-from typing import Dict, Any
-import openai
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from .preprompts import *
 from .llmconfigs import *
+from .llm_parsing import ParseError, load_json_reply, structured_completion
+from . import tracing
 
+VERDICTS = ("true", "false", "uncertain")
+VERDICT_ERROR = "error - Fallback to uncertain"   # model call failed (transient, worth retrying)
+FALLBACK_UNPARSABLE = "unparsable"                 # stmt["fallback"]: "uncertain" not judged by the model
 
+VERDICT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "verdict": {"type": "string", "enum": list(VERDICTS)},
+        "finalscore": {"type": "number", "minimum": 0, "maximum": 1},
+    },
+    "required": ["verdict", "finalscore"],
+}
 
-def statement_to_truthness(data: Dict[str, Any]) -> Dict[str, Any]:
+
+def failed_statements(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Statements whose step 7 call failed (verdict "error - …")."""
+    return [s for s in data.get("statements", []) if str(s.get("verdict", "")).startswith("error")]
+
+
+def is_fallback(stmt: Dict[str, Any]) -> bool:
+    """Verdict is a stand-in (failed call or unparsable reply) – never store or reuse it."""
+    return bool(stmt.get("fallback")) or str(stmt.get("verdict", "")).startswith("error")
+
+
+def fallback_statements(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [s for s in data.get("statements", []) if is_fallback(s)]
+
+
+def parse_verdict(reply: str) -> Tuple[str, float, str]:
+    """
+    {"verdict": ..., "finalscore": ...} → (verdict, score, raw reply).
+    The legacy two-line VERDICT:/FINALSCORE: format is accepted as well.
+    """
+    reply = reply.strip()
+    verdict_match = re.search(r"VERDICT:\s*(true|false|uncertain)", reply, re.I)
+    score_match   = re.search(r"FINALSCORE:\s*([0-1](?:\.\d+)?)", reply, re.I)
+    if verdict_match and score_match:
+        verdict, score = verdict_match.group(1), score_match.group(1)
+    else:
+        value = load_json_reply(reply)
+        if not isinstance(value, dict):
+            raise ValueError("expected a JSON object")
+        verdict, score = value.get("verdict"), value.get("finalscore")
+
+    verdict = str(verdict).strip().lower()
+    if verdict not in VERDICTS:
+        raise ValueError(f"verdict must be one of {VERDICTS}, got {verdict!r}")
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        raise ValueError(f"finalscore must be a number, got {score!r}")
+    if not 0.0 <= score <= 1.0:
+        raise ValueError(f"finalscore must be within 0..1, got {score}")
+    return verdict, score, reply
+
+
+def statement_to_truthness(
+    data: Dict[str, Any],
+    on_verdict: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Judge every statement; `on_verdict(stmt)` fires as soon as one is done."""
     print("Starting Step7: Statement to Truthness")
     print("...")
     print("...")
@@ -25,51 +84,42 @@ def statement_to_truthness(data: Dict[str, Any]) -> Dict[str, Any]:
         for ev in evidences:
             pmid = ev.get("pubmed_id") or "N/A"
             summary = (ev.get("summary") or "").strip().replace("\n", " ")
-            print(" --- Step7 Statement to Truthness --> Evidence Summary: ---")
-            print(f"Evidence: {summary}")
-            
             evidence_lines.append(f"- PMID {pmid}: {summary}")
         evidence_block = "\n".join(evidence_lines) or "No evidence provided."
 
-        print(" --- Step7 Statement to Truthness --> Evidence-Block and claim_text: ---")
-        print(f"Claim Text: {claim_text}")
-        print(f"Evidence: {evidence_block}")
+        tracing.event("step7.input", level="debug", claim=claim_text, evidence=evidence_block)
+        prompt = PROMPT_TMPL_S7.format(claim_text=claim_text, evidence_block=evidence_block, transcript=transcript)
         try:
-            prompt = PROMPT_TMPL_S7.format(claim_text=claim_text, evidence_block=evidence_block, transcript=transcript)
-            res = CLIENT_7.chat.completions.create(
-                model=MODEL_7,
-                messages=[{"role": "user", "content": prompt}],
+            verdict, score, reply = structured_completion(
+                "step7", CLIENT_7, MODEL_7, prompt,
+                parse=parse_verdict,
+                schema=VERDICT_SCHEMA,
                 temperature=TEMP_7,
                 max_tokens=MAX_TOKENS_7,
+                use_cache=CACHE_7,
             )
-            reply: str = res.choices[0].message.content.strip()
+        except ParseError as exc:
+            # model did not follow instructions (even after one repair) → mark as uncertain
+            print(f"ERROR ERROR ERROR --> Unparsable model output:\n{exc}")
+            stmt["verdict"]    = "uncertain"
+            stmt["confidence"] = 0.0
+            stmt["rationale"]  = f"Unparsable model output:\n{exc}"
+            stmt["fallback"]   = FALLBACK_UNPARSABLE
         except Exception as exc:
             # fall back to uncertain if model call fails
-            stmt["verdict"]    = "error - Fallback to uncertain"
+            stmt["verdict"]    = VERDICT_ERROR
             stmt["confidence"] = 0.0
             stmt["rationale"]  = f"Model call failed: {exc}"
-            continue
-
-        # -------- parse reply --------
-        verdict_match = re.search(r"VERDICT:\s*(true|false|uncertain)", reply, re.I)
-        print(" --- Step7-Statement to Truthness --> Model output --- ")
-        print(f"Model output:\n{reply}  ")
-        
-        score_match   = re.search(r"FINALSCORE:\s*([0-1](?:\.\d+)?)", reply, re.I)
-        print(" --- Extracted Information from prompt: ---")
-        print(f"Parsed verdict: {verdict_match.group(1) if verdict_match else 'N/A'} ")
-        
-        if verdict_match and score_match:
-            print(f"Parsed score: {score_match.group(1)}")
-            stmt["verdict"]    = verdict_match.group(1).lower()
-            stmt["confidence"] = float(score_match.group(1))
+        else:
+            tracing.event("step7.verdict", level="debug", claim=claim_text, reply=reply,
+                          verdict=verdict, score=score)
+            stmt["verdict"]    = verdict
+            stmt["confidence"] = score
             # keep the raw model reply for transparency
             stmt["rationale"]  = reply
-        else:
-            # model did not follow instructions → mark as uncertain
-            print(f"ERROR ERROR ERROR --> Unparsable model output:\n{reply}")
-            stmt["verdict"]    = "uncertain"
-            stmt["confidence"] = 0.0
-            stmt["rationale"]  = f"Unparsable model output:\n{reply}"
+            stmt.pop("fallback", None)
+
+        if on_verdict:
+            on_verdict(stmt)
 
     return data
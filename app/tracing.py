@@ -0,0 +1,197 @@
+"""
+REQUEST TRACING
+───────────────
+• Every pipeline run gets a request id held in a context variable, so
+  concurrent requests never share state (unlike swapping sys.stdout).
+• `span(name, **attrs)` times a block (steps, LLM calls, NCBI calls) and
+  records its parent span, status and attributes; `event()` records a
+  single point (prompts, replies, config dumps).
+• Records are JSON lines, queued and written by one background thread
+  (TRACE_FILE); a full queue drops records instead of blocking requests.
+• TRACE_LEVEL: "off" | "info" (spans, timings, tokens, cache hits)
+  | "debug" (+ prompts, replies and per-request config).
+• Span listeners (metrics.py) see every finished span, whatever the level.
+• Thread pools do not inherit context variables: wrap callables with
+  `propagate()` before handing them to an executor.
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+TRACE_LEVEL = os.environ.get("FACT_CHECKER_TRACE_LEVEL", "info")
+TRACE_FILE = os.environ.get("FACT_CHECKER_TRACE_FILE", os.path.join("logs", "trace.jsonl"))
+TRACE_QUEUE_MAX = 10_000      # records buffered before new ones are dropped
+TRACE_FLUSH_INTERVAL = 1.0    # seconds between writes of the sink thread
+
+LEVELS = {"off": 0, "info": 1, "debug": 2}
+
+T = TypeVar("T")
+
+_REQUEST_ID: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_SPAN_ID: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("span_id", default=None)
+_SPAN_IDS = itertools.count(1)
+_SPAN_LISTENERS: List[Callable[[Dict[str, Any]], None]] = []
+
+
+def enabled(level: str = "info") -> bool:
+    return LEVELS.get(level, 1) <= LEVELS.get(TRACE_LEVEL, 1)
+
+
+# ───────── sink ─────────
+class JsonlSink:
+    """Appends records to a JSONL file from a daemon thread."""
+
+    def __init__(self, path: str, max_queue: int = TRACE_QUEUE_MAX, interval: float = TRACE_FLUSH_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.dropped = 0
+        self.written = 0
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, record: Dict[str, Any]) -> None:
+        self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="trace-sink", daemon=True)
+                    self._thread.start()
+
+    def _drain(self) -> None:
+        lines = []
+        while True:
+            try:
+                lines.append(json.dumps(self._queue.get_nowait(), ensure_ascii=False, default=str))
+            except queue.Empty:
+                break
+        if not lines:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        self.written += len(lines)
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                with self._lock:    # flush() may drain concurrently; keep batches whole and in order
+                    self._drain()
+            except OSError:
+                pass
+
+    def flush(self) -> None:
+        """Write everything queued so far (used at shutdown and by scripts)."""
+        with self._lock:
+            self._drain()
+
+
+SINK = JsonlSink(TRACE_FILE)
+atexit.register(SINK.flush)
+
+
+def emit(record: Dict[str, Any], level: str = "info") -> None:
+    if enabled(level):
+        SINK.put(record)
+
+
+# ───────── context ─────────
+def request_id() -> Optional[str]:
+    return _REQUEST_ID.get()
+
+
+@contextmanager
+def request(rid: Optional[str] = None) -> Iterator[str]:
+    """Run the block under request id `rid` (a new one if not given)."""
+    rid = rid or uuid.uuid4().hex[:12]
+    token = _REQUEST_ID.set(rid)
+    try:
+        yield rid
+    finally:
+        _REQUEST_ID.reset(token)
+
+
+def propagate(fn: Callable[..., T]) -> Callable[..., T]:
+    """Bind `fn` to a copy of the current context (request id + parent span) for use in a thread pool."""
+    ctx = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+# ───────── spans & events ─────────
+def add_span_listener(fn: Callable[[Dict[str, Any]], None]) -> None:
+    """Call `fn(record)` for every finished span (runs in the request thread – keep it cheap)."""
+    _SPAN_LISTENERS.append(fn)
+
+
+class Span:
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.id = next(_SPAN_IDS)
+        self.parent = _SPAN_ID.get()
+        self.attrs = attrs
+        self.start = time.time()
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """Time the block; the record is written when it ends (status ok/error)."""
+    sp = Span(name, attrs)
+    token = _SPAN_ID.set(sp.id)
+    t0 = time.perf_counter()
+    status, error = "ok", None
+    try:
+        yield sp
+    except BaseException as exc:
+        status, error = "error", f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _SPAN_ID.reset(token)
+        record = {
+            "type": "span",
+            "name": name,
+            "request_id": _REQUEST_ID.get(),
+            "span_id": sp.id,
+            "parent_id": sp.parent,
+            "ts": sp.start,
+            "duration": round(time.perf_counter() - t0, 6),
+            "status": status,
+            "error": error,
+            **sp.attrs,
+        }
+        for listener in _SPAN_LISTENERS:
+            listener(record)
+        emit(record)
+
+
+def event(name: str, level: str = "info", **attrs: Any) -> None:
+    emit({
+        "type": "event",
+        "name": name,
+        "request_id": _REQUEST_ID.get(),
+        "parent_id": _SPAN_ID.get(),
+        "ts": time.time(),
+        **attrs,
+    }, level)
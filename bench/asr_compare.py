@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+ASR BACKEND COMPARISON
+──────────────────────
+• Runs step 1's speech-recognition backends (openai-whisper, faster-whisper
+  int8, …) on the same audio and reports model load time, median decode
+  latency, real-time factor and word error rate.
+• WER is measured against --reference (one transcript file per audio file,
+  or a single one for all), else against the first backend's output.
+• Audio is decoded once with ffmpeg (16 kHz mono) and handed to every
+  backend as samples, so only recognition is timed. The repo ships no
+  audio: pass any WAV/MP4/M4A files.
+
+    python -m bench.asr_compare clip.wav --reference bench/fixtures/transcript.txt \
+        --backends whisper faster-whisper --runs 3 --threads 8 --beam-size 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+REPO = Path(__file__).resolve().parent.parent
+WORD_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789' "
+
+
+def words(text: str) -> List[str]:
+    text = "".join(c if c in WORD_CHARS else " " for c in text.lower())
+    return text.split()
+
+
+def wer(reference: str, hypothesis: str) -> float:
+    """Word error rate: word-level edit distance / reference length."""
+    ref, hyp = words(reference), words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def compare(
+    audio_paths: Sequence[str],
+    backends: Sequence[str],
+    references: Sequence[Optional[str]],
+    runs: int,
+) -> Dict[str, Any]:
+    from app import step_1_audio_to_transcript as step1
+    from app.reel_utils import SAMPLE_RATE, decode_audio
+
+    clips = {path: decode_audio(path) for path in audio_paths}
+    report: Dict[str, Any] = {"config": {
+        "model": step1.WHISPER_MODEL_NAME, "beam_size": step1.ASR_BEAM_SIZE,
+        "cpu_threads": step1.ASR_CPU_THREADS, "runs": runs,
+    }, "backends": {}}
+    outputs: Dict[str, Dict[str, str]] = {}
+
+    for name in backends:
+        backend = step1.ASR_BACKENDS[name]()
+        t0 = time.perf_counter()
+        backend.model
+        load = time.perf_counter() - t0
+        files = {}
+        for path, audio in clips.items():
+            latencies = []
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                out = backend.transcribe(audio)
+                latencies.append(time.perf_counter() - t0)
+            seconds = statistics.median(latencies)
+            files[path] = {
+                "seconds": round(seconds, 3),
+                "rtf": round(seconds / (len(audio) / SAMPLE_RATE), 4),
+                "language": out["language"],
+                "text": out["text"],
+            }
+        outputs[name] = {p: f["text"] for p, f in files.items()}
+        report["backends"][name] = {"load_seconds": round(load, 3), "files": files}
+        del backend
+
+    baseline = backends[0]
+    for name, result in report["backends"].items():
+        errors = []
+        for path, ref in zip(audio_paths, references):
+            reference = ref if ref is not None else outputs[baseline][path]
+            result["files"][path]["wer"] = round(wer(reference, outputs[name][path]), 4)
+            errors.append(result["files"][path]["wer"])
+        result["wer"] = round(statistics.mean(errors), 4)
+        result["seconds"] = round(sum(f["seconds"] for f in result["files"].values()), 3)
+        result["rtf"] = round(statistics.mean(f["rtf"] for f in result["files"].values()), 4)
+    report["wer_against"] = "reference" if any(r is not None for r in references) else baseline
+    return report
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("audio", nargs="+", help="audio / video files (anything ffmpeg decodes)")
+    ap.add_argument("--backends", nargs="+", default=["whisper", "faster-whisper"])
+    ap.add_argument("--reference", nargs="*", default=[], help="reference transcripts (one per audio file, or one for all)")
+    ap.add_argument("--runs", type=int, default=3, help="decodes per file; the median is reported")
+    ap.add_argument("--threads", type=int, help="FACT_CHECKER_ASR_CPU_THREADS for faster-whisper")
+    ap.add_argument("--beam-size", type=int, help="FACT_CHECKER_ASR_BEAM_SIZE for all backends")
+    ap.add_argument("--json", help="write the report to this file")
+    args = ap.parse_args()
+
+    if args.reference and len(args.reference) not in (1, len(args.audio)):
+        ap.error("--reference needs one file, or one per audio file")
+    # step 1 reads its configuration at import time
+    if args.threads is not None:
+        os.environ["FACT_CHECKER_ASR_CPU_THREADS"] = str(args.threads)
+    if args.beam_size is not None:
+        os.environ["FACT_CHECKER_ASR_BEAM_SIZE"] = str(args.beam_size)
+    sys.path.insert(0, str(REPO))
+
+    refs = [Path(p).read_text(encoding="utf-8") for p in args.reference]
+    references: List[Optional[str]] = (refs * len(args.audio))[: len(args.audio)] if refs else [None] * len(args.audio)
+    report = compare(args.audio, args.backends, references, args.runs)
+
+    cfg = report["config"]
+    print(f"\nmodel={cfg['model']} beam_size={cfg['beam_size'] or 'default'} cpu_threads={cfg['cpu_threads'] or 'all'} "
+          f"runs={cfg['runs']} wer_against={report['wer_against']}")
+    print(f"{'backend':<18}{'load s':>9}{'decode s':>10}{'RTF':>8}{'WER':>8}")
+    for name, res in report["backends"].items():
+        print(f"{name:<18}{res['load_seconds']:>9.2f}{res['seconds']:>10.2f}{res['rtf']:>8.3f}{res['wer']:>8.3f}")
+    base = report["backends"][args.backends[0]]["seconds"]
+    for name, res in list(report["backends"].items())[1:]:
+        if res["seconds"]:
+            print(f"{name} vs {args.backends[0]}: {base / res['seconds']:.1f}x")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+COLD START BENCHMARK
+────────────────────
+• Measures how long `import app.main` takes in a fresh interpreter.
+• Starts `uvicorn app.main:app` in a subprocess and times
+  process start → port answering (GET /health) → warm (GET /ready == 200).
+• Prints the warm-up phases the app reports itself (import, Whisper,
+  LLM health check); --runs repeats and reports the median.
+
+    python -m bench.cold_start --runs 3
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(url: str) -> Tuple[Optional[int], Any]:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as resp:
+            return resp.status, json.loads(resp.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None, None
+
+
+def import_seconds() -> float:
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=REPO, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def one_run(timeout: float) -> Dict[str, Any]:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=os.environ.copy(),
+    )
+    result: Dict[str, Any] = {"listening": None, "ready": None, "startup": None}
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if proc.poll() is not None:
+                result["error"] = f"server exited with {proc.returncode}"
+                break
+            if result["listening"] is None:
+                status, _ = get(f"{base}/health")
+                if status == 200:
+                    result["listening"] = time.perf_counter() - t0
+            else:
+                status, body = get(f"{base}/ready")
+                startup = body.get("detail", body) if isinstance(body, dict) else None
+                if status == 200 or (startup or {}).get("state") == "failed":
+                    result["ready"] = time.perf_counter() - t0 if status == 200 else None
+                    result["startup"] = startup
+                    break
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return result
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--timeout", type=float, default=300.0, help="seconds to wait for /ready per run")
+    ap.add_argument("--json", help="write the results to this file")
+    args = ap.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    runs = [one_run(args.timeout) for _ in range(args.runs)]
+
+    def median(key: str) -> Optional[float]:
+        vals = [r[key] for r in runs if r[key] is not None]
+        return statistics.median(vals) if vals else None
+
+    report = {
+        "import_seconds": statistics.median(imports),
+        "listening_seconds": median("listening"),
+        "ready_seconds": median("ready"),
+        "runs": runs,
+    }
+    fmt = lambda v: "n/a" if v is None else f"{v:.2f} s"
+    print(f"import app.main  : {fmt(report['import_seconds'])}")
+    print(f"port answering   : {fmt(report['listening_seconds'])}")
+    print(f"ready (/ready)   : {fmt(report['ready_seconds'])}")
+    print(f"app-reported     : {json.dumps(runs[-1].get('startup'))}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0 if report["ready_seconds"] is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+FAKE NCBI E-UTILITIES SERVER
+────────────────────────────
+• esearch.fcgi (JSON) and efetch.fcgi (PubmedArticleSet XML), GET or POST.
+• Serves the recorded articles in bench/fixtures/pubmed_articles.json;
+  esearch picks a deterministic, query-dependent subset of them.
+• Adds configurable latency (+ jitter) per request.
+
+    python -m bench.fake_eutils --port 11600 --latency 0.3
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+FIXTURES = Path(__file__).parent / "fixtures" / "pubmed_articles.json"
+
+
+def load_articles(path: Path = FIXTURES) -> List[Dict[str, str]]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def article_xml(article: Dict[str, str]) -> str:
+    return (
+        "<PubmedArticle><MedlineCitation>"
+        f'<PMID Version="1">{escape(article["pmid"])}</PMID>'
+        f"<Article><ArticleTitle>{escape(article['title'])}</ArticleTitle>"
+        f"<Abstract><AbstractText>{escape(article['abstract'])}</AbstractText></Abstract>"
+        "</Article></MedlineCitation></PubmedArticle>"
+    )
+
+
+class FakeEutilsState:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, articles: List[Dict[str, str]] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.articles = articles if articles is not None else load_articles()
+        self.by_pmid = {a["pmid"]: a for a in self.articles}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def sleep(self) -> None:
+        with self._lock:
+            self.requests += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def search(self, term: str, retmax: int) -> List[str]:
+        if not self.articles:
+            return []
+        start = int(hashlib.md5(term.encode("utf-8")).hexdigest(), 16) % len(self.articles)
+        pmids = [a["pmid"] for a in self.articles]
+        rotated = pmids[start:] + pmids[:start]
+        return rotated[:retmax]
+
+
+def make_handler(state: FakeEutilsState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+        def _send(self, body: bytes, content_type: str, status: int = 200) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _handle(self, params: Dict[str, str]) -> None:
+            state.sleep()
+            path = urlparse(self.path).path
+            if path.endswith("esearch.fcgi"):
+                ids = state.search(params.get("term", ""), int(params.get("retmax", 20)))
+                body = {"esearchresult": {"count": str(len(ids)), "retmax": str(len(ids)), "idlist": ids}}
+                self._send(json.dumps(body).encode(), "application/json")
+            elif path.endswith("efetch.fcgi"):
+                ids = [i for i in params.get("id", "").split(",") if i]
+                xml = "".join(article_xml(state.by_pmid[i]) for i in ids if i in state.by_pmid)
+                body = f'<?xml version="1.0" ?><PubmedArticleSet>{xml}</PubmedArticleSet>'
+                self._send(body.encode("utf-8"), "text/xml")
+            else:
+                self._send(b"not found", "text/plain", 404)
+
+        def do_GET(self) -> None:
+            query = parse_qs(urlparse(self.path).query)
+            self._handle({k: v[0] for k, v in query.items()})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            self._handle({k: v[0] for k, v in form.items()})
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, **state_kwargs: Any) -> ThreadingHTTPServer:
+    """Start the server in a daemon thread; `server.server_address` has the real port, `server.state` the counters."""
+    state = FakeEutilsState(**state_kwargs)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, name="fake-eutils", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11600)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random 0..jitter seconds")
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(FakeEutilsState(args.latency, args.jitter)))
+    print(f"Fake E-utilities listening on http://{args.host}:{args.port}/entrez/eutils")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
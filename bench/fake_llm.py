@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+FAKE OPENAI-COMPATIBLE LLM SERVER
+─────────────────────────────────
+• Stands in for Ollama's /v1 endpoint: GET /v1/models,
+  POST /v1/chat/completions and POST /v1/embeddings.
+• Recognises which pipeline step a prompt belongs to and answers with a
+  canned reply in that step's expected format.
+• Adds configurable latency (+ jitter) per request.
+
+    python -m bench.fake_llm --port 11500 --latency 0.5
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+EMBED_DIM = 64
+
+# prompt marker → step (markers come from app/preprompts.py)
+STEP_MARKERS = [
+    ("YOUR PREVIOUS ANSWER", "repair"),
+    ("Extract **medical claims**", "step2"),
+    ("biomedical librarian", "step3"),
+    ("summarising evidence", "step5"),
+    ("EVIDENCE SUMMARIES:", "step6_batch"),
+    ("verifying whether the summary", "step6"),
+    ("professional medical fact-checker", "step7"),
+]
+
+CANNED: Dict[str, str] = {
+    "step2": json.dumps({"claims": [
+        "Fasting promotes autophagy and cellular renewal.",
+        "Fasting improves brain function.",
+        "Fasting raises ketone levels and supports metabolism.",
+    ]}),
+    "step3": json.dumps({"query": '("Fasting"[MeSH] OR fasting[tiab]) AND (autophagy[tiab] OR ketones[tiab])'}),
+    "step5": "Randomised trial in adults; fasting increased ketone bodies and markers of autophagy. "
+             "Small sample, short follow-up.",
+    "step6": "yes",
+    "step7": json.dumps({"verdict": "true", "finalscore": 0.8}),
+    "default": "ok",
+}
+
+
+def detect_step(prompt: str) -> str:
+    for marker, step in STEP_MARKERS:
+        if marker in prompt:
+            return step
+    return "default"
+
+
+def canned_reply(prompt: str, replies: Dict[str, str]) -> str:
+    step = detect_step(prompt)
+    if step == "step6_batch":
+        m = re.search(r"exactly (\d+) strings", prompt)
+        return json.dumps(["yes"] * int(m.group(1) if m else 1))
+    if step == "repair":
+        return canned_reply(prompt.split("YOUR PREVIOUS ANSWER", 1)[0], replies)
+    return replies.get(step, replies["default"])
+
+
+def fake_embedding(text: str, dim: int = EMBED_DIM) -> List[float]:
+    """Deterministic bag-of-words hash embedding (shared words → higher cosine)."""
+    vec = [0.0] * dim
+    for word in re.findall(r"[a-z]+", text.lower()):
+        h = int(hashlib.md5(word.encode()).hexdigest(), 16)
+        vec[h % dim] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class FakeLLMState:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, replies: Optional[Dict[str, str]] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.replies = {**CANNED, **(replies or {})}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def sleep(self) -> None:
+        with self._lock:
+            self.requests += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def make_handler(state: FakeLLMState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args: Any) -> None:      # keep benchmark output clean
+            pass
+
+        def _send(self, payload: Dict[str, Any], status: int = 200) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/").endswith("/models"):
+                self._send({"object": "list", "data": [{"id": "fake", "object": "model"}]})
+            else:
+                self._send({"error": "not found"}, 404)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            req = json.loads(self.rfile.read(length) or b"{}")
+            state.sleep()
+            if self.path.endswith("/chat/completions"):
+                prompt = "\n".join(m.get("content", "") for m in req.get("messages", []))
+                reply = canned_reply(prompt, state.replies)
+                self._send({
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": req.get("model", "fake"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": reply}}],
+                    "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(reply.split()),
+                              "total_tokens": len(prompt.split()) + len(reply.split())},
+                })
+            elif self.path.endswith("/embeddings"):
+                inputs = req.get("input", [])
+                inputs = [inputs] if isinstance(inputs, str) else inputs
+                self._send({
+                    "object": "list",
+                    "model": req.get("model", "fake"),
+                    "data": [{"object": "embedding", "index": i, "embedding": fake_embedding(t)}
+                             for i, t in enumerate(inputs)],
+                })
+            else:
+                self._send({"error": "not found"}, 404)
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, **state_kwargs: Any) -> ThreadingHTTPServer:
+    """Start the server in a daemon thread; `server.server_address` has the real port, `server.state` the counters."""
+    state = FakeLLMState(**state_kwargs)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11500)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random 0..jitter seconds")
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(FakeLLMState(args.latency, args.jitter)))
+    print(f"Fake LLM listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+OFFLINE PIPELINE BENCHMARK
+──────────────────────────
+• Starts the fake LLM (bench/fake_llm.py) and fake E-utilities
+  (bench/fake_eutils.py) servers and points the app at them.
+• Step 1 is skipped by pre-filling the transcript cache with the fixture
+  transcript (pass --audio to run Whisper for real).
+• --mode pipeline : N run_pipeline calls, --concurrency at a time
+  --mode steps    : the step functions 2–8 one after another, --requests times
+• Reports per-step p50 / p95 latency, throughput and peak RSS; --json saves
+  the report, --compare fails (exit 1) when a step's p95 regressed.
+• Caches (and the claim store) start empty and are disabled unless --warm is given.
+• --pubmed local answers steps 4/5 from a local FTS index built from
+  bench/fixtures/pubmed_baseline_sample.xml instead of fake E-utilities.
+
+    python -m bench.run_bench --requests 20 --concurrency 4 --llm-latency 0.5
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def summarise(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {
+            "n": len(vals),
+            "mean": sum(vals) / len(vals),
+            "p50": percentile(vals, 50),
+            "p95": percentile(vals, 95),
+        }
+        for name, vals in samples.items() if vals
+    }
+
+
+# ───────── environment ─────────
+def configure_app(args: argparse.Namespace, llm_url: str, eutils_url: str) -> None:
+    """Point the (already imported) app modules at the fake servers."""
+    from app import claim_store, llmconfigs, ncbi_client, pubmed_cache, pubmed_index, embeddings
+
+    for backend in llmconfigs.LLM_POOL.backends:
+        backend.base_url = llm_url
+        backend._client = None
+        backend.max_concurrency = max(backend.max_concurrency, args.concurrency * 4)
+    ncbi_client._CLIENT = ncbi_client.NCBIClient(base_url=eutils_url, rate=args.ncbi_rate, burst=args.concurrency)
+
+    if args.pubmed == "local":
+        pubmed_index.PubMedIndex(pubmed_index.PUBMED_INDEX_PATH).ingest([str(FIXTURES / "pubmed_baseline_sample.xml")])
+
+    for cache in (llmconfigs.LLM_CACHE, pubmed_cache.ESEARCH_CACHE, pubmed_cache.EFETCH_CACHE, embeddings.EMBED_CACHE):
+        cache.enabled = args.warm
+    claim_store.CLAIM_STORE.enabled = args.warm
+
+
+def prefill_transcripts(reel_ids: List[str], transcript: str) -> None:
+    from app.step_1_audio_to_transcript import TRANSCRIPT_CACHE, WHISPER_MODEL_NAME, transcript_key
+
+    entry = {"text": transcript, "language": "en", "model": WHISPER_MODEL_NAME}
+    TRANSCRIPT_CACHE.set_many({transcript_key("reel", rid): entry for rid in reel_ids})
+
+
+# ───────── modes ─────────
+def bench_pipeline(args: argparse.Namespace, transcript: str) -> Dict[str, Any]:
+    from app.pipeline import run_pipeline
+
+    reel_ids = [f"bench-{i}" for i in range(args.requests)]
+    if args.audio:
+        audio, ids = args.audio, [None] * args.requests
+    else:
+        audio, ids = str(FIXTURES / "missing.wav"), reel_ids
+        prefill_transcripts(reel_ids, transcript)
+
+    samples: Dict[str, List[float]] = {}
+
+    def one(reel_id: Any) -> None:
+        def on_event(event: str, data: Any) -> None:
+            if event == "step":
+                samples.setdefault(data["step"], []).append(data["seconds"])
+        t0 = time.perf_counter()
+        run_pipeline(audio, reel_id, on_event)
+        samples.setdefault("total", []).append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, ids))
+    wall = time.perf_counter() - t0
+    return {"wall_seconds": wall, "throughput_per_min": 60 * args.requests / wall, "steps": summarise(samples)}
+
+
+def bench_steps(args: argparse.Namespace, transcript: str) -> Dict[str, Any]:
+    from app.step_2_transcript_to_statement import update_statements
+    from app.step_3_statement_to_query import update_query
+    from app.step_4_query_to_link import query_to_link
+    from app.step_5_link_to_summary import link_to_summary
+    from app.step_6_reduce_to_evidence import reduce_to_evidence
+    from app.step_7_statement_to_truthness import statement_to_truthness
+    from app.step_8_statment_to_score import statement_to_score
+
+    steps: List[Callable[[Dict[str, Any]], Dict[str, Any]]] = [
+        update_statements, update_query, query_to_link, link_to_summary,
+        reduce_to_evidence, statement_to_truthness, statement_to_score,
+    ]
+    skeleton = json.loads((REPO / "app" / "json_example.json").read_text(encoding="utf-8"))
+    samples: Dict[str, List[float]] = {}
+
+    t0 = time.perf_counter()
+    for _ in range(args.requests):
+        data = {**json.loads(json.dumps(skeleton)), "transcript": transcript}
+        total = time.perf_counter()
+        for step in steps:
+            s0 = time.perf_counter()
+            data = step(data)
+            samples.setdefault(step.__name__, []).append(time.perf_counter() - s0)
+        samples.setdefault("total", []).append(time.perf_counter() - total)
+    wall = time.perf_counter() - t0
+    return {"wall_seconds": wall, "throughput_per_min": 60 * args.requests / wall, "steps": summarise(samples)}
+
+
+# ───────── report ─────────
+def print_report(report: Dict[str, Any]) -> None:
+    cfg = report["config"]
+    print(f"\nmode={cfg['mode']} requests={cfg['requests']} concurrency={cfg['concurrency']} "
+          f"llm_latency={cfg['llm_latency']}s ncbi_latency={cfg['ncbi_latency']}s warm={cfg['warm']} "
+          f"pubmed={cfg.get('pubmed', 'eutils')}")
+    print(f"{'step':<24}{'n':>5}{'mean':>10}{'p50':>10}{'p95':>10}")
+    for name, st in report["steps"].items():
+        print(f"{name:<24}{st['n']:>5}{st['mean']:>10.3f}{st['p50']:>10.3f}{st['p95']:>10.3f}")
+    print(f"\nwall time        : {report['wall_seconds']:.2f} s")
+    print(f"throughput       : {report['throughput_per_min']:.2f} pipelines/min")
+    print(f"peak RSS         : {report['peak_rss_mb']:.1f} MB")
+    print(f"fake LLM calls   : {report['llm_requests']}")
+    print(f"fake NCBI calls  : {report['ncbi_requests']}")
+
+
+def compare(report: Dict[str, Any], baseline_path: str, tolerance: float) -> List[str]:
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    regressions = []
+    for name, st in report["steps"].items():
+        base = baseline.get("steps", {}).get(name)
+        if base and st["p95"] > base["p95"] * (1 + tolerance) + 1e-3:
+            regressions.append(f"{name}: p95 {st['p95']:.3f}s vs baseline {base['p95']:.3f}s")
+    return regressions
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mode", choices=["pipeline", "steps"], default="pipeline")
+    ap.add_argument("--requests", type=int, default=10)
+    ap.add_argument("--concurrency", type=int, default=1, help="parallel run_pipeline calls (pipeline mode)")
+    ap.add_argument("--llm-latency", type=float, default=0.2)
+    ap.add_argument("--ncbi-latency", type=float, default=0.1)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--ncbi-rate", type=float, default=1000.0, help="token-bucket rate for the fake NCBI")
+    ap.add_argument("--pubmed", choices=["eutils", "local"], default="eutils", help="PubMed backend for steps 4/5")
+    ap.add_argument("--warm", action="store_true", help="keep PubMed / LLM / embedding caches enabled")
+    ap.add_argument("--cache-dir", help="cache directory (default: a fresh temp dir)")
+    ap.add_argument("--audio", help="real WAV file → run Whisper in step 1 too")
+    ap.add_argument("--json", help="write the report to this file")
+    ap.add_argument("--compare", help="baseline report (--json output) to check against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown vs baseline")
+    ap.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = ap.parse_args()
+
+    # caches must point to the bench directory before app modules are imported
+    os.environ["FACT_CHECKER_CACHE_DIR"] = args.cache_dir or tempfile.mkdtemp(prefix="fact_checker_bench_")
+    os.environ["FACT_CHECKER_PUBMED_BACKEND"] = args.pubmed
+    os.environ["FACT_CHECKER_PUBMED_INDEX"] = os.path.join(os.environ["FACT_CHECKER_CACHE_DIR"], "pubmed_index.sqlite3")
+    os.environ.setdefault("FACT_CHECKER_TRACE_FILE", os.path.join(os.environ["FACT_CHECKER_CACHE_DIR"], "trace.jsonl"))
+    os.chdir(REPO)
+    sys.path.insert(0, str(REPO))
+
+    from bench import fake_eutils, fake_llm
+
+    llm = fake_llm.serve(latency=args.llm_latency, jitter=args.jitter)
+    ncbi = fake_eutils.serve(latency=args.ncbi_latency, jitter=args.jitter)
+    llm_url = "http://%s:%d/v1" % llm.server_address
+    eutils_url = "http://%s:%d/entrez/eutils" % ncbi.server_address
+
+    sink = sys.stdout if args.verbose else io.StringIO()
+    with redirect_stdout(sink), redirect_stderr(sink):
+        configure_app(args, llm_url, eutils_url)
+        transcript = (FIXTURES / "transcript.txt").read_text(encoding="utf-8").strip()
+        run = bench_pipeline if args.mode == "pipeline" else bench_steps
+        result = run(args, transcript)
+
+    report = {
+        "config": {
+            "mode": args.mode, "requests": args.requests, "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency, "ncbi_latency": args.ncbi_latency, "warm": args.warm,
+            "pubmed": args.pubmed,
+        },
+        **result,
+        "peak_rss_mb": peak_rss_mb(),
+        "llm_requests": llm.state.requests,
+        "ncbi_requests": ncbi.state.requests,
+    }
+    print_report(report)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.compare:
+        regressions = compare(report, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())